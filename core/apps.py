@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def create_notes_search_triggers(sender, using, **kwargs):
+    from .search import NOTES_SEARCH_TABLE, create_notes_search_triggers
+
+    connection = connections[using]
+    if connection.vendor == "sqlite" and NOTES_SEARCH_TABLE in connection.introspection.table_names():
+        with connection.schema_editor() as schema_editor:
+            create_notes_search_triggers(schema_editor)
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        post_migrate.connect(create_notes_search_triggers, sender=self)
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def get_project_version_key(project_id: int) -> str:
+    return f"project:{project_id}:version"
+
+
+def get_projects_versions(project_ids: Iterable[int]) -> dict[int, int]:
+    """Get the current data version of each of the given projects"""
+    keys = {project_id: get_project_version_key(project_id) for project_id in project_ids}
+    versions = cache.get_many(keys.values())
+    result = {}
+    for project_id, key in keys.items():
+        if (version := versions.get(key)) is None:
+            # start from the current time so that a version lost by the cache never goes back to an already used one
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        result[project_id] = version
+    return result
+
+
+def bump_project_version(project_id: int):
+    """Change the data version of the project, so that everything cached for the previous one is not used anymore"""
+    key = get_project_version_key(project_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+    set_modified(f"project:{project_id}")
+
+
+def set_modified(*names: str):
+    """Record the current time as the last modification of the given things, like `project:1` or `user:1`"""
+    now = time.time()
+    cache.set_many({f"{name}:modified": now for name in names}, timeout=None)
+
+
+def get_last_modified(names: Iterable[str]) -> float:
+    """Get the time of the last modification of any of the given things, as a timestamp"""
+    keys = [f"{name}:modified" for name in names]
+    times = cache.get_many(keys)
+    if missing := [key for key in keys if key not in times]:
+        # a time lost by the cache is replaced by the current one, so that it's never older than the modification
+        now = time.time()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        times.update(cache.get_many(missing))
+    return max(times.values(), default=0)
+
+
+# categories of the projects, by project id, with the version of their tree, as tuples of the values of their fields
+_categories_trees: OrderedDict[int, tuple[int, tuple[tuple, ...]]] = OrderedDict()
+_categories_trees_lock = threading.Lock()
+
+
+def get_categories_tree(project_id: int, tree_version: int) -> Optional[tuple[tuple, ...]]:
+    """Get the categories of the project kept in this process, if they are for the given version of its tree"""
+    with _categories_trees_lock:
+        if (entry := _categories_trees.get(project_id)) is None or entry[0] != tree_version:
+            return None
+        _categories_trees.move_to_end(project_id)
+        return entry[1]
+
+
+def has_categories_tree(project_id: int) -> bool:
+    """Tell if categories of the project are kept in this process, maybe for an older version of its tree"""
+    return project_id in _categories_trees
+
+
+def set_categories_tree(project_id: int, tree_version: int, rows: Iterable[tuple]):
+    """Keep in this process the categories of the project for the given version of its tree, and forget the
+    projects not used for the longest time if there are too many of them"""
+    if not (max_size := settings.CATEGORIES_TREE_CACHE_SIZE):
+        return
+    rows = tuple(rows)
+    with _categories_trees_lock:
+        _categories_trees[project_id] = (tree_version, rows)
+        _categories_trees.move_to_end(project_id)
+        while len(_categories_trees) > max_size:
+            _categories_trees.popitem(last=False)
+
+
+class _Flight:
+    """A computation in progress in this process, whose result is shared with the callers asking for it meanwhile"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.has_result = False
+        self.result = None
+
+
+_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+
+# how often to look in the cache for a value computed by another process
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05
+
+
+def single_flight(key: str, compute: Callable[[], Any], timeout: Optional[int], wait: float) -> Any:
+    """Compute the value missing from the cache at `key` and cache it, but only once at a time for all the callers.
+
+    In this process, the callers asking for the same key while it's computed wait for the result of the first one.
+    Across processes, the first one takes a lock in the cache and the others wait for the value to be cached. They
+    compute it themselves if they waited more than `wait` seconds, or if the one computing it failed.
+    """
+    if not wait:
+        value = compute()
+        cache.set(key, value, timeout=timeout)
+        return value
+
+    with _flights_lock:
+        if is_leader := (flight := _flights.get(key)) is None:
+            flight = _flights[key] = _Flight()
+
+    if not is_leader:
+        if flight.done.wait(wait) and flight.has_result:
+            return flight.result
+        return compute()
+
+    try:
+        flight.result = _compute_with_lock(key, compute, timeout, wait)
+        flight.has_result = True
+        return flight.result
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+
+def _compute_with_lock(key: str, compute: Callable[[], Any], timeout: Optional[int], wait: float) -> Any:
+    """Compute and cache the value at `key` holding a lock in the cache, or wait for the process holding it"""
+    lock_key = f"{key}:lock"
+    # the lock expires in case the process holding it is killed
+    has_lock = cache.add(lock_key, True, timeout=max(1, round(wait)))
+    deadline = time.monotonic() + wait
+    while not has_lock and time.monotonic() < deadline:
+        time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+        if (value := cache.get(key)) is not None:
+            return value
+        # free again without the value being cached: the process holding it failed
+        has_lock = cache.add(lock_key, True, timeout=max(1, round(wait)))
+
+    try:
+        # it may have been cached by another process just before we got the lock
+        if has_lock and (value := cache.get(key)) is not None:
+            return value
+        value = compute()
+        cache.set(key, value, timeout=timeout)
+        return value
+    finally:
+        if has_lock:
+            cache.delete(lock_key)
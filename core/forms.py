@@ -4,7 +4,7 @@ from typing import Tuple
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Field, Layout
 from django.core.exceptions import ValidationError
-from django.forms import ModelForm, Select, BooleanField, TextInput
+from django.forms import ModelForm, Select, BooleanField, TextInput, Form, FileField, ChoiceField
 from django.utils.safestring import mark_safe
 from django_registration.forms import RegistrationFormUniqueEmail
 from mptt.forms import MPTTAdminForm
@@ -286,6 +286,29 @@ class QuantityEditForm(QuantityInCategoryForm):
         super().__init__(category=kwargs["instance"].category, *args, **kwargs)
 
 
+class QuantityImportRowForm(ModelForm):
+    """To validate a row of imported quantities, the category being resolved by the importer"""
+
+    class Meta:
+        model = Quantity
+        fields = ["value", "date", "time", "notes"]
+
+
+class QuantitiesImportForm(Form):
+    file = FileField(
+        label="File to import",
+        help_text="One quantity by row, with the columns of the export: category, date, time, value and notes. "
+        "The category is its full path, like «Parent / Child».",
+    )
+    format = ChoiceField(choices=[("csv", "CSV"), ("ndjson", "NDJSON")], initial="csv")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.with_helper = True
+        self.helper = FormHelper()
+        self.helper.form_tag = False
+
+
 class QuantityDeleteForm(ModelForm):
     confirm = BooleanField(required=True, label="Check this to confirm deletion")
 
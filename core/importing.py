@@ -0,0 +1,106 @@
+import csv
+import json
+from typing import Iterable, Iterator, Optional
+
+from django.db import transaction
+
+from .forms import QuantityImportRowForm
+from .models import CategoryDailyTotal, Project, Quantity
+
+FORMATS = ("csv", "ndjson")
+
+
+def read_rows(lines: Iterable[str], format: str) -> Iterator[tuple[int, Optional[dict]]]:
+    """Read the rows of a CSV (with a header) or NDJSON file, with their line number, or `None` for an invalid row"""
+    if format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+class QuantitiesImporter:
+    """Import quantities in a project from rows having the fields of the export: category, date, time, value, notes.
+
+    The category is the path of the category in the project, as in the export, and is resolved without any query.
+    Everything is done in one transaction, with the quantities created by batches, and nothing is saved if a row is
+    invalid. The daily totals and the data version of the project are only refreshed once, at the end.
+    """
+
+    batch_size = 1000
+    max_errors = 50
+
+    def __init__(self, project: Project, batch_size: Optional[int] = None):
+        self.project = project
+        self.batch_size = batch_size or self.batch_size
+        self.categories = {path: category_id for category_id, path in project.get_categories_paths().items() if path}
+        self.errors: list[tuple[int, str]] = []
+        self.nb_created = 0
+
+    def get_quantity(self, line_number: int, row: Optional[dict]) -> Optional[Quantity]:
+        """Validate the row and return the quantity to create, or `None` if the row is invalid"""
+        if row is None:
+            self.errors.append((line_number, "Invalid row"))
+            return None
+
+        path = str(row.get("category") or "").strip()
+        if (category_id := self.categories.get(path)) is None:
+            self.errors.append((line_number, f"Unknown category «{path}»"))
+            return None
+
+        form = QuantityImportRowForm(
+            {key: "" if value is None else value for key, value in row.items()},
+            instance=Quantity(category_id=category_id, project=self.project),
+        )
+        if not form.is_valid():
+            self.errors.append(
+                (line_number, " ".join(f"{field}: {' '.join(errors)}" for field, errors in form.errors.items()))
+            )
+            return None
+
+        return form.instance
+
+    def run(self, rows: Iterable[tuple[int, Optional[dict]]]) -> bool:
+        """Import the rows given by `read_rows`. Return `False` if there are errors, in which case nothing is saved"""
+        keys = set()
+        batch = []
+
+        with transaction.atomic():
+            for line_number, row in rows:
+                if (quantity := self.get_quantity(line_number, row)) is None:
+                    if len(self.errors) >= self.max_errors:
+                        break
+                    continue
+                if self.errors:
+                    # nothing will be saved, we only continue to find other errors
+                    continue
+                batch.append(quantity)
+                keys.add(quantity.daily_total_key)
+                if len(batch) >= self.batch_size:
+                    self.save_batch(batch)
+                    batch = []
+
+            if self.errors:
+                transaction.set_rollback(True)
+                self.nb_created = 0
+                return False
+
+            self.save_batch(batch)
+            CategoryDailyTotal.objects.refresh(keys)
+            Project.objects.data_changed(self.project.pk, dates=[key[1] for key in keys])
+
+        return True
+
+    def save_batch(self, quantities: list[Quantity]):
+        if quantities:
+            Quantity.objects.bulk_create(quantities)
+            self.nb_created += len(quantities)
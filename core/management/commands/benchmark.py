@@ -0,0 +1,277 @@
+import itertools
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+
+from core.models import Category, Intervals, Project, Quantity, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Time and count the queries of each page of the application and of the summed quantities of each project, "
+        "for the data of a user (see the `generate_data` command), and the lookups of the categories index on a large "
+        "tree. The results are written as JSON, and can be compared to the ones of a previous run, for example of "
+        "another commit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="User whose data is used.")
+        parser.add_argument("--output", type=Path, help="Path of the JSON file to write. By default printed.")
+        parser.add_argument("--compare", type=Path, help="Path of the JSON file of a previous run to compare with.")
+        parser.add_argument("--repeat", type=int, default=10, help="Number of times each measure is done.")
+        parser.add_argument(
+            "--index-categories",
+            type=int,
+            default=5000,
+            help="Approximate number of categories of the tree generated in memory to compare the lookups of the "
+            "categories index with the list scans it replaced. 0 to skip it.",
+        )
+        parser.add_argument(
+            "--date",
+            type=lambda value: datetime.strptime(value, "%Y-%m-%d").date(),
+            help="Date of the past period to use. By default one year ago.",
+        )
+
+    def handle(self, *args, username, output=None, compare=None, repeat, date=None, index_categories=5000, **options):
+        if (user := User.objects.filter(username=username).first()) is None:
+            raise CommandError(f"Unknown user: {username}")
+        if (project := user.projects.annotate(nb=Count("quantities")).order_by("-nb").first()) is None:
+            raise CommandError(f"No project for the user: {username}")
+        if (quantity := Quantity.objects.filter(project=project).order_by("-date").first()) is None:
+            raise CommandError(f"No quantity in the project: {project}")
+
+        self.repeat = repeat
+        self.date = date or datetime.now().date() - timedelta(days=365)
+        results = {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "database": connection.vendor,
+            "settings": {
+                name: getattr(settings, name) for name in ("SUMMED_QUANTITIES_ROLLUP", "QUANTITIES_PAGINATION")
+            },
+            "urls": self.benchmark_urls(user, project, quantity),
+            "summed_quantities": self.benchmark_summed_quantities(user),
+            "categories_index": self.benchmark_categories_index(index_categories) if index_categories else [],
+        }
+
+        if compare is not None:
+            self.compare(json.loads(compare.read_text()), results, self.stdout if output else self.stderr)
+
+        content = json.dumps(results, indent=2)
+        if output is None:
+            self.stdout.write(content)
+        else:
+            output.write_text(content)
+
+    def measure(self, function) -> dict:
+        """Run the function `repeat` times after a first run, giving the times in milliseconds and the queries"""
+        with CaptureQueriesContext(connection) as first_queries:
+            start = time.perf_counter()
+            function()
+            first_time = time.perf_counter() - start
+        times = []
+        for _ in range(self.repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                function()
+                times.append(time.perf_counter() - start)
+        return {
+            "first_ms": round(first_time * 1000, 2),
+            "first_queries": len(first_queries),
+            "median_ms": round(statistics.median(times) * 1000, 2),
+            "min_ms": round(min(times) * 1000, 2),
+            "queries": len(queries),
+        }
+
+    def benchmark_urls(self, user: User, project: Project, quantity: Quantity) -> list[dict]:
+        """Measure a GET on each page of `quantifier/urls.py` having only the arguments we know, with and without a
+        past date"""
+        client = Client()
+        client.force_login(user)
+        values = {"project_pk": project.pk, "category_pk": quantity.category_id, "quantity_pk": quantity.pk}
+
+        results = []
+        for pattern in get_resolver().url_patterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            if not set(names := pattern.pattern.regex.groupindex) <= set(values):
+                continue
+            path = reverse(pattern.name, kwargs={name: values[name] for name in names})
+            for period, query in (("current", {}), ("past", {"date": self.date})):
+
+                def get():
+                    response = client.get(path, query)
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                    return response
+
+                key = {"name": pattern.name, "path": path, "period": period}
+                results.append(key | {"status": get().status_code} | self.measure(get))
+                self.stderr.write(f"{path} ({period}): {results[-1]['median_ms']} ms")
+        return results
+
+    def benchmark_summed_quantities(self, user: User) -> list[dict]:
+        """Measure the computation of the summed quantities of each project, then when cached, for today and for
+        the past date, by their own timeframe and by all the smaller ones"""
+        results = []
+        for project in user.projects.order_by("sort_order"):
+            project.cached_categories
+            for period, date in (("current", datetime.now().date()), ("past", self.date)):
+                for interval in Intervals:
+                    if project.has_interval and interval > Intervals(project.interval):
+                        continue
+                    key = {"project": project.name, "period": period, "date": str(date), "interval": interval.value}
+                    results.append(
+                        key
+                        | {
+                            "computed": self.measure(lambda: project.compute_summed_quantities(date, interval)),
+                            "cached": self.measure(lambda: project.get_summed_quantities(date, interval)),
+                        }
+                    )
+        return results
+
+    @staticmethod
+    def generate_categories(project: Project, number: int) -> list[Category]:
+        """Generate in memory, in MPTT order, a tree of about `number` categories with 4 levels under the root"""
+        depth = 4
+        fan_out = max(2, round(number ** (1 / depth)))
+        attnames = Category.get_tree_row_attnames()
+        rows, counter, pks = [], itertools.count(1), itertools.count(1)
+
+        def add(parent_pk, path, sort_order):
+            row = {
+                "id": (pk := next(pks)),
+                "project_id": project.pk,
+                "name": f"Category {'.'.join(map(str, path))}",
+                "parent_id": parent_pk,
+                "expected_quantity": None,
+                "sort_order": sort_order,
+                "tree_id": 1,
+                "lft": next(counter),
+                "level": len(path),
+            }
+            rows.append(row)
+            if len(path) < depth:
+                for position in range(1, fan_out + 1):
+                    add(pk, path + (position,), position)
+            row["rght"] = next(counter)
+
+        add(None, (), 1)
+        return [Category.from_tree_row(project, tuple(row[attname] for attname in attnames)) for row in rows]
+
+    def benchmark_categories_index(self, number: int) -> list[dict]:
+        """Measure the lookups of the categories of a project with the index of `Project.categories_index`, and
+        with the scans of the list of the categories done before it, for a sample of the categories of a tree
+        generated in memory"""
+        project = Project(pk=0, name="Index benchmark", tree_version=0)
+        categories = self.generate_categories(project, number)
+        project.set_cached_categories(categories, keep_in_process=False)
+        project.categories_index
+        # every category would take minutes with the list scans
+        sample = categories[1 :: max(1, len(categories) // 500)]
+
+        def scan_category(category_pk):
+            try:
+                return [category for category in project.cached_categories if category.pk == category_pk][0]
+            except IndexError:
+                return None
+
+        def scan_descendants(category):
+            found = False
+            result = []
+            for cat in project.cached_categories:
+                if not found:
+                    found = cat.pk == category.pk
+                    continue
+                if cat.level <= category.level:
+                    break
+                result.append(cat)
+            return result
+
+        def scan_siblings_categories(category, include_it=False):
+            result = category.parent.get_children()
+            if not include_it:
+                return [cat for cat in result if cat.pk != category.pk]
+            return list(result)
+
+        def scan_sibling(category, offset):
+            siblings = scan_siblings_categories(category, include_it=True)
+            position = siblings.index(category) + offset
+            return siblings[position] if 0 <= position < len(siblings) else None
+
+        lookups = {
+            "get_category": (
+                lambda: [scan_category(category.pk) for category in sample],
+                lambda: [project.get_category(category.pk) for category in sample],
+            ),
+            "get_descendant_categtories": (
+                lambda: [scan_descendants(category) for category in sample],
+                lambda: [project.get_descendant_categtories(category) for category in sample],
+            ),
+            "siblings": (
+                lambda: [
+                    (scan_sibling(category, -1), scan_sibling(category, 1), scan_siblings_categories(category))
+                    for category in sample
+                ],
+                lambda: [
+                    (
+                        category.get_previous_sibling(),
+                        category.get_next_sibling(),
+                        project.get_siblings_categories(category),
+                    )
+                    for category in sample
+                ],
+            ),
+        }
+
+        results = []
+        for name, (scan, lookup) in lookups.items():
+            results.append(
+                {"lookup": name, "categories": len(categories), "sample": len(sample)}
+                | {"list_scan": self.measure(scan), "index": self.measure(lookup)}
+            )
+            self.stderr.write(
+                f"{name} ({len(sample)} of {len(categories)} categories): "
+                f"{results[-1]['list_scan']['median_ms']} ms with list scans, {results[-1]['index']['median_ms']} ms "
+                "with the index"
+            )
+        return results
+
+    def compare(self, previous: dict, current: dict, out):
+        """Write the changes of the median times and of the numbers of queries from a previous run"""
+
+        def changes(before: dict, after: dict) -> str:
+            ratio = after["median_ms"] / before["median_ms"] if before["median_ms"] else 1
+            queries = after["queries"] - before["queries"]
+            return f"x{ratio:.2f}" + (f", {queries:+} queries" if queries else "")
+
+        previous_urls = {(result["path"], result["period"]): result for result in previous.get("urls", [])}
+        for result in current["urls"]:
+            if before := previous_urls.get((result["path"], result["period"])):
+                out.write(f"{result['path']} {result['period']}: {changes(before, result)}")
+
+        previous_sums = {
+            (result["project"], result["period"], result["interval"]): result
+            for result in previous.get("summed_quantities", [])
+        }
+        for result in current["summed_quantities"]:
+            if before := previous_sums.get((result["project"], result["period"], result["interval"])):
+                out.write(
+                    f"{result['project']} {result['period']} {result['interval']}: "
+                    f"computed {changes(before['computed'], result['computed'])}, "
+                    f"cached {changes(before['cached'], result['cached'])}"
+                )
+
+        previous_lookups = {result["lookup"]: result for result in previous.get("categories_index", [])}
+        for result in current.get("categories_index", []):
+            if before := previous_lookups.get(result["lookup"]):
+                out.write(f"{result['lookup']}: index {changes(before['index'], result['index'])}")
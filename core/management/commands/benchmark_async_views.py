@@ -0,0 +1,122 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import RequestFactory
+from django.utils.functional import SimpleLazyObject
+
+from core import views
+from core.models import Intervals, User
+
+# the sync views and their async variants, with the name of the objects they need
+VIEWS = (
+    ("projects", views.ProjectsView, views.AsyncProjectsView),
+    ("project", views.ProjectDetailsView, views.AsyncProjectDetailsView),
+    ("category", views.CategoryDetailsView, views.AsyncCategoryDetailsView),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the latency of the projects and details views with their async variants, under concurrent load. "
+        "The sync views are called from threads, as with WSGI, and the async ones from an event loop, as with ASGI. "
+        "The middlewares are not used, only the user is loaded for each request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="User whose projects are displayed.")
+        parser.add_argument("--project", type=int, help="Id of the project to display. By default the first one.")
+        parser.add_argument("--concurrency", type=int, default=10, help="Number of requests at the same time.")
+        parser.add_argument("--requests", type=int, default=200, help="Number of requests by view and variant.")
+        parser.add_argument("--date", type=lambda value: datetime.strptime(value, "%Y-%m-%d").date())
+        parser.add_argument("--interval", choices=Intervals.values)
+
+    def handle(self, *args, username, project=None, concurrency, requests, date=None, interval=None, **options):
+        if (user := User.objects.filter(username=username).first()) is None:
+            raise CommandError(f"Unknown user: {username}")
+        projects = [project_ for project_ in user.cached_projects if project_.nb_categories > 1]
+        if project is not None:
+            projects = [project_ for project_ in projects if project_.pk == project]
+        if not projects:
+            raise CommandError("No project with categories to display.")
+        project = projects[0]
+        category = project.main_categories[0]
+
+        self.user_pk = user.pk
+        self.factory = RequestFactory()
+        query = "&".join(
+            f"{name}={value}" for name, value in (("date", date), ("interval", interval)) if value is not None
+        )
+        targets = {
+            "projects": ({}, "/projects/"),
+            "project": ({"project_pk": project.pk}, project.get_absolute_url()),
+            "category": ({"project_pk": project.pk, "category_pk": category.pk}, category.get_absolute_url()),
+        }
+
+        self.stdout.write(f"{requests} requests by view, {concurrency} at the same time, in milliseconds")
+        self.stdout.write(f"{'view':<10}{'variant':<8}{'p50':>10}{'p99':>10}{'req/s':>10}")
+        for name, sync_view, async_view in VIEWS:
+            kwargs, path = targets[name]
+            path = f"{path}?{query}" if query else path
+            for variant, view_class, run in (
+                ("wsgi", sync_view, self.run_sync),
+                ("asgi", async_view, self.run_async),
+            ):
+                view = view_class.as_view()
+                # a first request to fill the caches, as on a running server
+                run(view, kwargs, path, 1, 1)
+                start = time.perf_counter()
+                durations = run(view, kwargs, path, requests, concurrency)
+                total = time.perf_counter() - start
+                percentiles = statistics.quantiles(durations, n=100, method="inclusive")
+                self.stdout.write(
+                    f"{name:<10}{variant:<8}{percentiles[49] * 1000:>10.1f}{percentiles[98] * 1000:>10.1f}"
+                    f"{requests / total:>10.1f}"
+                )
+
+    def get_request(self, path):
+        request = self.factory.get(path)
+        # loaded when used, as done by the authentication middleware
+        request.user = SimpleLazyObject(lambda: User.objects.get(pk=self.user_pk))
+        return request
+
+    def run_sync(self, view, kwargs, path, requests, concurrency) -> list[float]:
+        def run_one(_):
+            request = self.get_request(path)
+            start = time.perf_counter()
+            try:
+                response = view(request, **kwargs)
+                if hasattr(response, "render"):
+                    response.render()
+                return time.perf_counter() - start
+            finally:
+                close_old_connections()
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            return list(executor.map(run_one, range(requests)))
+
+    def run_async(self, view, kwargs, path, requests, concurrency) -> list[float]:
+        async def run_all():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def run_one():
+                # each request has its own thread for its sync code, as with the ASGI handler
+                async with semaphore, ThreadSensitiveContext():
+                    request = self.get_request(path)
+                    start = time.perf_counter()
+                    try:
+                        response = await view(request, **kwargs)
+                        if hasattr(response, "render"):
+                            await sync_to_async(response.render)()
+                        return time.perf_counter() - start
+                    finally:
+                        await sync_to_async(close_old_connections)()
+
+            return await asyncio.gather(*(run_one() for _ in range(requests)))
+
+        return asyncio.run(run_all())
@@ -0,0 +1,133 @@
+import itertools
+import random
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Category, CategoryDailyTotal, Intervals, Project, Quantity, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate users with a project for each timeframe and goal mode, each with a tree of categories and "
+        "quantities spread over the last years, to measure the performances at a realistic scale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1, help="Number of users to create.")
+        parser.add_argument("--prefix", default="bench", help="Prefix of the usernames, followed by a number.")
+        parser.add_argument("--password", help="Password of the users. By default they cannot log in.")
+        parser.add_argument("--depth", type=int, default=3, help="Number of levels of categories in each project.")
+        parser.add_argument("--fan-out", type=int, default=4, help="Number of sub-categories of each category.")
+        parser.add_argument("--quantities", type=int, default=10_000, help="Number of quantities in each project.")
+        parser.add_argument("--years", type=int, default=3, help="Number of past years over which to spread them.")
+        parser.add_argument("--batch-size", type=int, default=5_000, help="Number of quantities created by query.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the random values, to get the same data.")
+
+    def handle(
+        self, *args, users, prefix, password=None, depth, fan_out, quantities, years, batch_size, seed, **options
+    ):
+        usernames = [f"{prefix}{number}" for number in range(1, users + 1)]
+        if existing := list(User.objects.filter(username__in=usernames).values_list("username", flat=True)):
+            raise CommandError(f"Existing user(s): {', '.join(sorted(existing))}")
+
+        self.random = random.Random(seed)
+        self.end_date = datetime.now().date()
+        self.start_date = self.end_date - timedelta(days=365 * years)
+
+        for username in usernames:
+            with transaction.atomic():
+                user = User.objects.create_user(username, password=password)
+                nb_categories = nb_quantities = 0
+                # a project for each timeframe, with its limit to exceed or to reach
+                for interval, goal_mode in itertools.product(Intervals, (False, True)):
+                    project = Project.objects.create(
+                        owner=user,
+                        name=f"{interval.label} {'goal' if goal_mode else 'limit'}",
+                        interval=interval,
+                        quantity_name="points",
+                        interval_quantity=self.random.randint(10, 100) * 100,
+                        goal_mode=goal_mode,
+                    )
+                    categories = self.create_categories(project, depth, fan_out)
+                    nb_categories += len(categories)
+                    nb_quantities += self.create_quantities(project, categories, quantities, batch_size)
+                    CategoryDailyTotal.objects.rebuild(project.categories.all())
+                    Project.objects.tree_changed(project.pk)
+            self.stdout.write(
+                f"{username}: {len(Intervals) * 2} projects, {nb_categories} categories, {nb_quantities} quantities"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"{users} user(s) generated."))
+
+    def create_categories(self, project: Project, depth: int, fan_out: int) -> list[Category]:
+        """Create the tree of categories under the root category of the project, a level at a time.
+
+        The MPTT fields are computed here instead of by saving each category, to create many of them quickly.
+        """
+        root = project.categories.get(parent__isnull=True)
+
+        # each category is identified by the path of its positions and the ones of its ancestors
+        lfts, rghts = {}, {}
+        counter = itertools.count(root.lft)
+
+        def number(path: tuple[int, ...]):
+            lfts[path] = next(counter)
+            if len(path) < depth:
+                for position in range(1, fan_out + 1):
+                    number(path + (position,))
+            rghts[path] = next(counter)
+
+        number(())
+        Category.objects.filter(pk=root.pk).update(rght=rghts[()])
+
+        pks = {(): root.pk}
+        for level in range(1, depth + 1):
+            paths = [path for path in lfts if len(path) == level]
+            Category.objects.bulk_create(
+                Category(
+                    project=project,
+                    parent_id=pks[path[:-1]],
+                    name=f"Category {'.'.join(map(str, path))}",
+                    sort_order=path[-1],
+                    expected_quantity=self.random.randint(1, 20) * 10 if self.random.random() < 0.3 else None,
+                    tree_id=root.tree_id,
+                    lft=lfts[path],
+                    rght=rghts[path],
+                    level=level,
+                )
+                for path in paths
+            )
+            # the pks are not returned by all the databases, so they are found from the `lft` of the categories
+            pks_by_lft = dict(Category.objects.filter(tree_id=root.tree_id, level=level).values_list("lft", "pk"))
+            pks.update((path, pks_by_lft[lfts[path]]) for path in paths)
+
+        return list(Category.objects.filter(tree_id=root.tree_id, level__gt=0))
+
+    def create_quantities(self, project: Project, categories: list[Category], number: int, batch_size: int) -> int:
+        """Create quantities in random categories and dates, mostly in the categories without sub-categories"""
+        if not categories:
+            return 0
+        leaves = [category for category in categories if category.is_leaf_node()]
+        nb_days = (self.end_date - self.start_date).days
+        created = 0
+        while created < number:
+            batch = []
+            for _ in range(min(batch_size, number - created)):
+                category = self.random.choice(leaves if self.random.random() < 0.9 else categories)
+                batch.append(
+                    Quantity(
+                        project=project,
+                        category_id=category.pk,
+                        value=self.random.randint(1, 100),
+                        date=self.start_date + timedelta(days=self.random.randint(0, nb_days)),
+                        time=time(self.random.randint(0, 23), self.random.choice((0, 15, 30, 45)))
+                        if self.random.random() < 0.5
+                        else None,
+                        notes="Some notes\nwith details" if self.random.random() < 0.1 else "",
+                    )
+                )
+            Quantity.objects.bulk_create(batch)
+            created += len(batch)
+        return created
@@ -0,0 +1,49 @@
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importing import FORMATS, QuantitiesImporter, read_rows
+from core.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Import quantities in a project from a CSV or NDJSON file having the columns of the export: "
+        "category, date, time, value and notes. Nothing is imported if a row is invalid."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_id", type=int, help="Id of the project in which to import the quantities.")
+        parser.add_argument("path", type=Path, help="Path of the file to import.")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Format of the file. By default guessed from its extension, and CSV if it cannot be.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=QuantitiesImporter.batch_size,
+            help="Number of quantities created by query.",
+        )
+
+    def handle(self, *args, project_id, path, format=None, batch_size=None, **options):
+        if (project := Project.objects.filter(pk=project_id).first()) is None:
+            raise CommandError(f"Unknown project: {project_id}")
+        if format is None:
+            format = "ndjson" if path.suffix.lower() in (".ndjson", ".jsonl") else "csv"
+
+        importer = QuantitiesImporter(project, batch_size=batch_size)
+        try:
+            with path.open(encoding="utf-8-sig", newline="") as lines:
+                success = importer.run(read_rows(lines, format))
+        except (OSError, UnicodeDecodeError, csv.Error) as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+
+        if not success:
+            for line_number, error in importer.errors:
+                self.stderr.write(f"Line {line_number}: {error}")
+            raise CommandError("Nothing imported because of invalid rows.")
+
+        self.stdout.write(self.style.SUCCESS(f"{importer.nb_created} quantities imported in «{project.name}»."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Category, CategoryDailyTotal, Project
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily totals of the categories from their quantities, fixing the ones that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            type=int,
+            action="append",
+            dest="projects",
+            help="Only rebuild the daily totals of this project. Can be used many times.",
+        )
+
+    def handle(self, *args, projects=None, **options):
+        categories = None
+        if projects:
+            if missing := set(projects) - set(Project.objects.filter(pk__in=projects).values_list("pk", flat=True)):
+                raise CommandError(f"Unknown project(s): {', '.join(map(str, sorted(missing)))}")
+            categories = Category.objects.filter(project_id__in=projects)
+
+        nb_saved, nb_deleted = CategoryDailyTotal.objects.rebuild(categories)
+        for project_id in projects or Project.objects.values_list("pk", flat=True):
+            Project.objects.data_changed(project_id)
+        self.stdout.write(self.style.SUCCESS(f"Daily totals rebuilt: {nb_saved} saved, {nb_deleted} deleted."))
@@ -0,0 +1,56 @@
+# Generated by Django 4.1 on 2022-09-10 10:12
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def fill_daily_totals(apps, schema_editor):
+    Quantity = apps.get_model("core", "Quantity")
+    CategoryDailyTotal = apps.get_model("core", "CategoryDailyTotal")
+    CategoryDailyTotal.objects.bulk_create(
+        (
+            CategoryDailyTotal(category_id=category_id, date=date, total=total, count=count)
+            for category_id, date, total, count in Quantity.objects.order_by()
+            .values("category_id", "date")
+            .annotate(total=Sum("value"), count=Count("id"))
+            .values_list("category_id", "date", "total", "count")
+            .iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0044_text_for_category_and_quantity_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryDailyTotal",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("total", models.PositiveBigIntegerField(default=0)),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="daily_totals", to="core.category"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="categorydailytotal",
+            constraint=models.UniqueConstraint(
+                fields=("category", "date"), name="core_categorydailytotal_category_date_uniq"
+            ),
+        ),
+        migrations.RunPython(
+            fill_daily_totals,
+            migrations.RunPython.noop,
+        ),
+    ]
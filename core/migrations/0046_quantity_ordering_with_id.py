@@ -0,0 +1,20 @@
+# Generated by Django 4.1 on 2022-09-11 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0045_category_daily_total"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="quantity",
+            options={
+                "ordering": ["-date", models.OrderBy(models.F("time"), descending=True, nulls_last=True), "-id"],
+                "verbose_name_plural": "quantities",
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.1 on 2022-09-12 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0046_quantity_ordering_with_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="tree_version",
+            field=models.PositiveBigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Changed each time the categories change, to know if the ones kept in memory can be used.",
+            ),
+        ),
+    ]
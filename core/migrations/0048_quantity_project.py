@@ -0,0 +1,38 @@
+# Generated by Django 4.1 on 2022-09-12 14:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_quantities_project(apps, schema_editor):
+    Category = apps.get_model("core", "Category")
+    Quantity = apps.get_model("core", "Quantity")
+    Quantity.objects.update(
+        project_id=Subquery(Category.objects.filter(pk=OuterRef("category_id")).values("project_id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0047_project_tree_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quantity",
+            name="project",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="quantities",
+                to="core.project",
+            ),
+        ),
+        migrations.RunPython(
+            fill_quantities_project,
+            migrations.RunPython.noop,
+        ),
+    ]
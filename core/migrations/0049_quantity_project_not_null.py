@@ -0,0 +1,28 @@
+# Generated by Django 4.1 on 2022-09-12 14:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0048_quantity_project"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="quantity",
+            name="project",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="quantities",
+                to="core.project",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quantity",
+            index=models.Index(fields=["project", "date", "time"], name="core_quanti_project_db0fe6_idx"),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.1 on 2022-09-13 09:20
+
+from django.db import migrations, models
+from django.db.models.functions import Trunc
+
+
+def fill_period_starts(apps, schema_editor):
+    CategoryDailyTotal = apps.get_model("core", "CategoryDailyTotal")
+    CategoryDailyTotal.objects.update(
+        **{
+            f"{kind}_start": Trunc("date", kind, output_field=models.DateField())
+            for kind in ("week", "month", "year")
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0049_quantity_project_not_null"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="categorydailytotal",
+            name="week_start",
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="categorydailytotal",
+            name="month_start",
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="categorydailytotal",
+            name="year_start",
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            fill_period_starts,
+            migrations.RunPython.noop,
+        ),
+    ]
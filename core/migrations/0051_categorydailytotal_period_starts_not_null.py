@@ -0,0 +1,40 @@
+# Generated by Django 4.1 on 2022-09-13 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0050_categorydailytotal_period_starts"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="categorydailytotal",
+            name="week_start",
+            field=models.DateField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name="categorydailytotal",
+            name="month_start",
+            field=models.DateField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name="categorydailytotal",
+            name="year_start",
+            field=models.DateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="categorydailytotal",
+            index=models.Index(fields=["category", "week_start", "total"], name="core_catego_categor_a4219e_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="categorydailytotal",
+            index=models.Index(fields=["category", "month_start", "total"], name="core_catego_categor_edcc31_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="categorydailytotal",
+            index=models.Index(fields=["category", "year_start", "total"], name="core_catego_categor_6b8b10_idx"),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.1 on 2022-09-21 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0051_categorydailytotal_period_starts_not_null"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PeriodSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "interval",
+                    models.CharField(
+                        choices=[
+                            ("daily", "Daily"),
+                            ("weekly", "Weekly"),
+                            ("monthly", "Monthly"),
+                            ("yearly", "Yearly"),
+                            ("none", "No timeframe"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField()),
+                ("data", models.JSONField()),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="period_snapshots",
+                        to="core.project",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="periodsnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("project", "interval", "date"), name="core_periodsnapshot_project_interval_date_uniq"
+            ),
+        ),
+    ]
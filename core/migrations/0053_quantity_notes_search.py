@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from core.search import create_notes_search_index, drop_notes_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0052_period_snapshot"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_notes_search_index, drop_notes_search_index),
+    ]
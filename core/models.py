@@ -3,27 +3,51 @@ from __future__ import annotations
 import calendar
 import enum
 import re
+import time
+from bisect import bisect_left
+from collections import defaultdict
 from datetime import datetime, timedelta
-from functools import cached_property
-from typing import Optional
+from functools import cached_property, partial, reduce
+from operator import or_
+from typing import Iterable, NamedTuple, Optional
 
 from dateutil.relativedelta import relativedelta
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
-from django.db import models, DEFAULT_DB_ALIAS
-from django.db.models import Q, Sum, Deferrable, Count
+from django.db import models, transaction, DEFAULT_DB_ALIAS
+from django.db.models import Q, Sum, Deferrable, Count, F, OuterRef, Subquery
+from django.db.models.base import ModelState
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.utils import timezone
 from mptt.managers import TreeManager
 
 from mptt.models import MPTTModel
 from mptt.querysets import TreeQuerySet
-from mptt.utils import get_cached_trees
 from orderable.managers import OrderableManager
 from orderable.models import Orderable
 from orderable.querysets import OrderableQueryset
 
+from .caching import (
+    bump_project_version,
+    get_categories_tree,
+    get_projects_versions,
+    set_categories_tree,
+    set_modified,
+    single_flight,
+)
 from .fields import TreeForeignKeyNoRoot
+from .rollups import (
+    RollUpParameters,
+    get_rollup_engine,
+    roll_up_from_subtree_totals,
+    roll_up_recursive,
+    roll_up_vectorized,
+)
+from .timing import timed
 
 
 class User(AbstractUser):
@@ -35,13 +59,15 @@ class User(AbstractUser):
         queryset._fetch_all()
         return queryset
 
+    @cached_property
+    def cached_projects_positions(self) -> dict[int, int]:
+        """Position of each project in `cached_projects`, by pk"""
+        return {project.pk: position for position, project in enumerate(self.cached_projects)}
+
     def get_project(self, project_pk):
-        if not project_pk:
-            return None
-        try:
-            return [project for project in self.cached_projects if project.pk == project_pk][0]
-        except IndexError:
+        if (position := self.cached_projects_positions.get(project_pk)) is None:
             return None
+        return self.cached_projects._result_cache[position]
 
 
 class Intervals(models.TextChoices):
@@ -120,6 +146,14 @@ def get_dates_interval(date: datetime.date, interval: Intervals) -> tuple[dateti
     return start_date, end_date
 
 
+def get_period_starts(date: datetime.date) -> dict[str, datetime.date]:
+    """Get the first day of the week, month and year of the date, by name of the fields storing them"""
+    return {
+        f"{interval.unit_name}_start": get_dates_interval(date, interval)[0]
+        for interval in (Intervals.weekly, Intervals.monthly, Intervals.yearly)
+    }
+
+
 def get_prev_and_next_dates_interval(date: datetime.time, interval: Intervals) -> tuple[datetime.date, datetime.date]:
     if not interval or interval == Intervals.daily:
         return date - relativedelta(days=1), date + relativedelta(days=1)
@@ -156,6 +190,199 @@ def get_interval_str(date: datetime.date, interval: Intervals):
     return "All time"
 
 
+def cache_categories_tree(categories: list[Category]) -> Category:
+    """Cache the parent and the children of each category of a project, given in MPTT order, and return the root.
+
+    It's what `mptt.utils.get_cached_trees` does, but in linear time, by using the parent ids instead of looking for
+    each parent in all the categories of the level above.
+    """
+    parent_field = Category._meta.get_field("parent")
+    by_pk = {}
+    for category in categories:
+        category._cached_children = []
+        category._mptt_use_cached_ancestors = True
+        if (parent := by_pk.get(category.parent_id)) is not None:
+            parent_field.set_cached_value(category, parent)
+            parent._cached_children.append(category)
+        by_pk[category.pk] = category
+    return categories[0]
+
+
+class ProjectManager(OrderableManager):
+    def data_changed(self, project_id: int, dates: Optional[Iterable[datetime.date]] = None):
+        """To call when a project, one of its categories or one of its quantities changed.
+
+        When only quantities changed, their old and new `dates` can be given so that only the snapshots of the periods
+        including them are deleted.
+        """
+        if dates is not None:
+            dates = set(dates)
+        bump_project_version(project_id)
+        PeriodSnapshot.objects.invalidate(project_id, dates)
+        # and again once committed, in case the previous data was cached by another request in the meantime
+        transaction.on_commit(partial(bump_project_version, project_id))
+        transaction.on_commit(partial(PeriodSnapshot.objects.invalidate, project_id, dates))
+
+    def projects_changed(self, owner_id: int):
+        """To call when a project of the user was created, changed or deleted, for the pages showing all of them"""
+        set_modified(f"user:{owner_id}")
+        transaction.on_commit(partial(set_modified, f"user:{owner_id}"))
+
+    def tree_changed(self, project_id: int) -> int:
+        """To call when the categories of a project changed, so that the ones kept by the processes are not used"""
+        # a new unique version, and not an incremented one, to never reuse the one of a rolled back transaction
+        tree_version = time.time_ns()
+        self.filter(pk=project_id).update(tree_version=tree_version)
+        self.data_changed(project_id)
+        return tree_version
+
+    @staticmethod
+    def set_cached_categories(
+        projects: dict[int, Project], categories: Iterable[Category]
+    ) -> dict[int, list[Category]]:
+        """Cache on each of the given projects its categories taken from `categories`"""
+        categories_by_project = defaultdict(list)
+        for category in categories:
+            category.project = projects[category.project_id]
+            categories_by_project[category.project_id].append(category)
+        for project_id, project_categories in categories_by_project.items():
+            projects[project_id].set_cached_categories(project_categories)
+        return categories_by_project
+
+    @timed("summed-quantities")
+    def summed_quantities_for(
+        self,
+        projects: Iterable[Project],
+        date: Optional[datetime.date] = None,
+        interval: Optional[Intervals] = None,
+    ) -> dict[Project, dict[Category, dict[str, int]]]:
+        """Do `Project.get_summed_quantities` for many projects at once.
+
+        The results are first read from the cache, then from the snapshots of the past periods. For the other
+        projects, the categories with their summed quantities for the asked period are fetched in a single query,
+        then the roll-up is done in memory for each project.
+        The categories are cached on each project as if `cached_categories` was called.
+        """
+        projects = {project.pk: project for project in projects}
+        if not projects:
+            return {}
+
+        versions = get_projects_versions(projects)
+        cache_keys = {
+            project_id: project.get_summed_quantities_cache_key(date, interval, versions[project_id])
+            for project_id, project in projects.items()
+        }
+        cached = cache.get_many(cache_keys.values())
+
+        found = {project_id: cached[cache_key] for project_id, cache_key in cache_keys.items() if cache_key in cached}
+        # the past periods not in the cache may have been snapshotted
+        from_snapshots = PeriodSnapshot.objects.read(
+            [project for project_id, project in projects.items() if project_id not in found], date, interval
+        )
+        found |= from_snapshots
+
+        result, to_cache = {}, {}
+        if found:
+            # we still need the categories, to use them as keys
+            if missing := [
+                project_id
+                for project_id in found
+                if "cached_categories" not in projects[project_id].__dict__
+                and not projects[project_id].set_cached_categories_from_tree_cache()
+            ]:
+                self.set_cached_categories(projects, Category.objects.filter(project_id__in=missing))
+            for project_id, cached_summed_quantities in found.items():
+                project = projects[project_id]
+                if (summed_quantities := project.summed_quantities_from_cache(cached_summed_quantities)) is not None:
+                    result[project] = summed_quantities
+                    if project_id in from_snapshots:
+                        to_cache[cache_keys[project_id]] = cached_summed_quantities
+
+        if not (
+            projects := {project_id: project for project_id, project in projects.items() if project not in result}
+        ):
+            cache.set_many(to_cache, timeout=settings.SUMMED_QUANTITIES_CACHE_TIMEOUT)
+            return result
+
+        # projects may not share the same period (for example if `interval` is not given), so we group them by dates
+        projects_by_dates = defaultdict(list)
+        for project in projects.values():
+            projects_by_dates[project.get_summed_quantities_dates(date, interval)].append(project.pk)
+
+        sum_filter = Q()
+        for dates, project_ids in projects_by_dates.items():
+            project_filter = Q(project_id__in=project_ids)
+            if dates:
+                project_filter &= Q(daily_totals__date__gte=dates[0]) & Q(daily_totals__date__lte=dates[1])
+            sum_filter |= project_filter
+
+        categories_by_project = self.set_cached_categories(
+            projects,
+            Category.objects.filter(project_id__in=projects).annotate(
+                summed_values=Sum("daily_totals__total", default=0, filter=sum_filter)
+            ),
+        )
+
+        computed = {}
+        for project_id, categories in categories_by_project.items():
+            project = projects[project_id]
+            result[project] = project.roll_up_summed_quantities(
+                {category.id: category.summed_values for category in categories}, date, interval
+            )
+            to_cache[cache_keys[project_id]] = computed[project] = project.summed_quantities_to_cache(result[project])
+        cache.set_many(to_cache, timeout=settings.SUMMED_QUANTITIES_CACHE_TIMEOUT)
+        PeriodSnapshot.objects.save_later(computed, date, interval, versions)
+
+        return result
+
+
+class CategoriesIndex(NamedTuple):
+    """Indexes on the categories of a project, in MPTT order, to find them without scanning the whole list"""
+
+    categories: list[Category]
+    by_pk: dict[int, Category]
+    positions: dict[int, int]
+    lfts: list[int]
+    children: dict[Optional[int], list[Category]]
+    siblings_positions: dict[int, int]
+
+    @classmethod
+    def build(cls, categories: list[Category]) -> CategoriesIndex:
+        children = defaultdict(list)
+        siblings_positions = {}
+        for category in categories:
+            siblings = children[category.parent_id]
+            siblings_positions[category.pk] = len(siblings)
+            siblings.append(category)
+        return cls(
+            categories=categories,
+            by_pk={category.pk: category for category in categories},
+            positions={category.pk: position for position, category in enumerate(categories)},
+            lfts=[category.lft for category in categories],
+            children=dict(children),
+            siblings_positions=siblings_positions,
+        )
+
+    def get_descendants(self, category: Category, include_it: bool = False) -> list[Category]:
+        if (position := self.positions.get(category.pk)) is None:
+            return []
+        # all the categories are in the same tree, so the descendants are the ones with a `lft` before its `rght`
+        end = bisect_left(self.lfts, self.categories[position].rght, lo=position)
+        return self.categories[position if include_it else position + 1 : end]
+
+    def get_siblings(self, category: Category) -> list[Category]:
+        return self.children.get(category.parent_id, [])
+
+    def get_sibling(self, category: Category, offset: int) -> Optional[Category]:
+        """Get the sibling at the given offset (-1 for the previous one, 1 for the next one) of the category"""
+        if (position := self.siblings_positions.get(category.pk)) is None:
+            return None
+        siblings = self.get_siblings(category)
+        if 0 <= (position := position + offset) < len(siblings):
+            return siblings[position]
+        return None
+
+
 class Project(Orderable, models.Model):
     """A project is where some quantities are saved in categories."""
 
@@ -199,6 +426,13 @@ class Project(Orderable, models.Model):
             )
         ],
     )
+    tree_version = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Changed each time the categories change, to know if the ones kept in memory can be used.",
+    )
+
+    objects = ProjectManager()
 
     class Meta(Orderable.Meta):
         constraints = [
@@ -240,11 +474,25 @@ class Project(Orderable, models.Model):
         return f"{self.get_interval_display().capitalize()} amount of {self.interval_quantity} {self.quantity_name}"
 
     def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # the tree version is only changed by `tree_changed`, never saved back from an outdated instance
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "tree_version"
+            ]
         # create a root category
         is_new = not self.pk
         super().save(*args, **kwargs)
         if is_new:
             self.categories.create(name="")
+        Project.objects.data_changed(self.pk)
+        Project.objects.projects_changed(self.owner_id)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        Project.objects.projects_changed(self.owner_id)
+        return result
 
     @cached_property
     def visible_categories(self):
@@ -288,9 +536,24 @@ class Project(Orderable, models.Model):
     def get_add_quantity_url(self):
         return reverse("quantity_create", kwargs={"project_pk": self.pk})
 
+    def get_add_quantity_form_url(self):
+        return reverse("quantity_create_form", kwargs={"project_pk": self.pk})
+
+    def get_summary_url(self):
+        return reverse("project_summary", kwargs={"project_pk": self.pk})
+
     def get_quantities_url(self):
         return reverse("quantities_list", kwargs={"project_pk": self.pk})
 
+    def get_quantities_export_url(self):
+        return reverse("quantities_export", kwargs={"project_pk": self.pk})
+
+    def get_quantities_import_url(self):
+        return reverse("quantities_import", kwargs={"project_pk": self.pk})
+
+    def get_categories_reorganize_url(self):
+        return reverse("categories_reorganize", kwargs={"project_pk": self.pk})
+
     @cached_property
     def has_interval(self):
         return self.interval != "none"
@@ -305,19 +568,50 @@ class Project(Orderable, models.Model):
         return self.__dict__["root_category"]
 
     @cached_property
+    @timed("categories")
     def cached_categories(self):
-        categories = self.categories.all()
-        categories._fetch_all()
-        self.__dict__["root_category"] = get_cached_trees(categories)[0]
-        return categories
+        if not self.set_cached_categories_from_tree_cache():
+            categories = self.categories.all()
+            categories._fetch_all()
+            self.set_cached_categories(categories._result_cache)
+        return self.__dict__["cached_categories"]
+
+    def set_cached_categories(self, categories: list[Category], keep_in_process: bool = True):
+        """Use the given categories, fetched elsewhere and in MPTT order, as `cached_categories`"""
+        queryset = self.categories.all()
+        queryset._result_cache = categories
+        queryset._prefetch_done = True
+        self.__dict__["root_category"] = cache_categories_tree(categories)
+        self.__dict__["cached_categories"] = queryset
+        self.__dict__.pop("categories_index", None)
+        if keep_in_process:
+            set_categories_tree(self.pk, self.tree_version, (category.get_tree_row() for category in categories))
+
+    def set_cached_categories_from_tree_cache(self) -> bool:
+        """Set `cached_categories` from the categories kept by the process, without any query, if they are still
+        valid. Return `False` if they are not."""
+        if (rows := get_categories_tree(self.pk, self.tree_version)) is None:
+            return False
+        self.set_cached_categories([Category.from_tree_row(self, row) for row in rows], keep_in_process=False)
+        return True
+
+    @cached_property
+    def categories_index(self) -> CategoriesIndex:
+        return CategoriesIndex.build(self.cached_categories._result_cache)
 
     def get_category(self, category_pk):
-        if not category_pk:
-            return None
-        try:
-            return [category for category in self.cached_categories if category.pk == category_pk][0]
-        except IndexError:
-            return None
+        return self.categories_index.by_pk.get(category_pk)
+
+    def get_categories_paths(self) -> dict[int, str]:
+        """Path of each category: names of its ancestors below the root category, then its own, joined by " / "."""
+        return {
+            category.id: " / ".join(
+                ancestor.name
+                for ancestor in self.get_ancestors_categories(category, include_it=True)
+                if ancestor.parent_id
+            )
+            for category in self.cached_categories
+        }
 
     def get_ancestors_categories(self, category, ascending=False, include_it=False):
         result = [category] if include_it else []
@@ -328,143 +622,313 @@ class Project(Orderable, models.Model):
         return result if ascending else result[::-1]
 
     def get_descendant_categtories(self, category, include_it=False):
-        found = False
-        result = []
-        for cat in self.cached_categories:
-            if not found:
-                if cat.pk == category.pk:
-                    found = True
-                    if include_it:
-                        result.append(category)
-                continue
-            if cat.level <= category.level:
-                break
-            result.append(cat)
-        return result
+        return self.categories_index.get_descendants(category, include_it)
 
     def get_siblings_categories(self, category, include_it=False):
-        result = category.parent.get_children()
+        result = self.categories_index.get_siblings(category)
         if not include_it:
             return [cat for cat in result if cat.pk != category.pk]
         return list(result)
 
-    def get_summed_quantities(
-        self, date: Optional[datetime.date] = None, interval: Optional[Intervals] = None
-    ) -> dict[Category, dict[str, int]]:
-        sum_kwargs = {}
-        if not self.has_interval and not interval:
-            interval = Intervals.none
-        elif interval is None:
-            interval = self.interval
-
-        alltime = self.has_interval and interval == Intervals.none
-        no_details = alltime or self.has_interval and Intervals(interval) < Intervals(self.interval)
-
-        if date:
-            if not alltime:
-                start_date, end_date = get_dates_interval(date, interval)
-                sum_kwargs["filter"] = Q(quantities__date__gte=start_date) & Q(quantities__date__lte=end_date)
-
-        summed_values = dict(
-            self.categories.annotate(summed_values=Sum("quantities__value", default=0, **sum_kwargs)).values_list(
-                "id", "summed_values"
+    def reorganize_categories(self, children: dict[int, list[int]]) -> int:
+        """Give a new shape to the tree of categories, from the ordered children of the categories by pk, the root
+        category being the parent of the top level ones, and the categories not given having no children.
+
+        The MPTT fields and the orders are computed here in a single pass, then only the categories that changed are
+        saved, with a few bulk updates instead of moving them one at a time. Return the number of categories changed.
+        """
+        with transaction.atomic():
+            categories = {category.pk: category for category in self.categories.select_for_update()}
+            root = next(category for category in categories.values() if category.parent_id is None)
+
+            given = set()
+            for parent_pk, children_pks in children.items():
+                for pk in (parent_pk, *children_pks):
+                    if pk not in categories:
+                        raise ValidationError(f"Unknown category: {pk}")
+                for pk in children_pks:
+                    if pk == root.pk or pk in given:
+                        raise ValidationError(f"Category given more than once: {pk}")
+                    given.add(pk)
+                names = [categories[pk].name for pk in children_pks]
+                if len(set(names)) != len(names):
+                    raise ValidationError(f"Sub-categories with the same name in «{categories[parent_pk].name}».")
+            if missing := categories.keys() - given - {root.pk}:
+                raise ValidationError(f"Categories not given: {', '.join(map(str, sorted(missing)))}")
+
+            # depth first, without recursion as the tree can be deep: each category is entered, then its children,
+            # then exited, giving its `lft` and `rght`
+            fields = ("parent_id", "sort_order", "lft", "rght", "level")
+            values, lfts, counter = {}, {}, root.lft
+            stack = [(root.pk, None, root.sort_order, root.level, False)]
+            while stack:
+                pk, parent_pk, sort_order, level, exiting = stack.pop()
+                if exiting:
+                    values[pk] = (parent_pk, sort_order, lfts[pk], counter, level)
+                else:
+                    lfts[pk] = counter
+                    stack.append((pk, parent_pk, sort_order, level, True))
+                    stack.extend(
+                        (child_pk, pk, position, level + 1, False)
+                        for position, child_pk in reversed(list(enumerate(children.get(pk, ()), start=1)))
+                    )
+                counter += 1
+            if len(values) != len(categories):
+                raise ValidationError("A category cannot be moved under itself or one of its sub-categories.")
+
+            changed = [
+                category
+                for pk, category in categories.items()
+                if tuple(getattr(category, field) for field in fields) != values[pk]
+            ]
+            if not changed:
+                return 0
+            moved = [category for category in changed if category.parent_id != values[category.pk][0]]
+            if moved:
+                # the names are unique by parent, so the moved categories are renamed for a moment to be able to
+                # exchange the parents of categories having the same name
+                names = {category.pk: category.name for category in moved}
+                for category in moved:
+                    category.name = f" {category.pk} "
+                Category.objects.bulk_update(moved, ["name"])
+                for category in moved:
+                    category.name = names[category.pk]
+            for category in changed:
+                for field, value in zip(fields, values[category.pk]):
+                    setattr(category, field, value)
+            Category.objects.bulk_update(
+                changed, ["parent", "sort_order", "lft", "rght", "level"] + (["name"] if moved else [])
             )
-        )
-        result = {category: {"self_used": summed_values[category.id]} for category in self.cached_categories}
-
-        def update_count(category, is_root=False):
-            for sub_category in (children := category.get_children()):
-                update_count(sub_category)
-
-            res_cat = result[category]
-
-            interval_quantity = self.interval_quantity
-            expected_quantity = category.expected_quantity
-            if self.has_interval:
-                factor = Intervals(self.interval).count_in(interval, date)
-                if interval_quantity:
-                    interval_quantity = round(interval_quantity * factor)
-                if expected_quantity:
-                    expected_quantity = round(expected_quantity * factor)
-
-            if expected_quantity:
-                res_cat["self_used_not_expected"] = 0
-                res_cat["self_expected"] = expected_quantity
-                res_cat["self_unexpected"] = max(0, res_cat["self_used"] - res_cat["self_expected"])
-                res_cat["self_expected_not_used"] = (
-                    res_cat["self_expected"] - res_cat["self_used"] + res_cat["self_unexpected"]
-                )
-            else:
-                res_cat["self_used_not_expected"] = res_cat["self_used"]
-                res_cat["self_expected"] = res_cat["self_unexpected"] = res_cat["self_expected_not_used"] = 0
-
-            keys = ["used"]
-            if not alltime and not no_details:
-                keys.extend(["used_not_expected", "expected", "unexpected", "expected_not_used"])
 
-                if expected_quantity:
-                    for key in ["used_not_expected", "expected"]:
-                        res_cat[key] = res_cat[f"self_{key}"]
+            self.tree_version = Project.objects.tree_changed(self.pk)
+            for name in ("cached_categories", "root_category", "categories_index"):
+                self.__dict__.pop(name, None)
+        return len(changed)
 
-                    res_cat["used"] = res_cat["self_used"] + sum(
-                        result[sub_category]["used"] for sub_category in category.get_children()
-                    )
-                    res_cat["unexpected"] = max(0, res_cat["used"] - res_cat["self_expected"])
-                    res_cat["expected_not_used"] = res_cat["expected"] - res_cat["used"] + res_cat["unexpected"]
+    def get_summed_quantities_interval(self, interval: Optional[Intervals] = None) -> Intervals:
+        """Get the interval really used by `get_summed_quantities` for the given one"""
+        if not self.has_interval and not interval:
+            return Intervals.none
+        if interval is None:
+            return Intervals(self.interval)
+        return Intervals(interval)
 
-                    keys = ["used"]
+    def get_summed_quantities_dates(
+        self, date: Optional[datetime.date] = None, interval: Optional[Intervals] = None
+    ) -> Optional[tuple[datetime.date, datetime.date]]:
+        """Get the dates to filter the quantities on for `get_summed_quantities`, if any"""
+        interval = self.get_summed_quantities_interval(interval)
+        if not date or (self.has_interval and interval == Intervals.none):
+            return None
+        return get_dates_interval(date, interval)
 
-            for key in keys:
-                res_cat[key] = res_cat[f"self_{key}"] + sum(
-                    result[sub_category][key] for sub_category in category.get_children()
-                )
+    def get_summed_quantities_period(
+        self, date: Optional[datetime.date] = None, interval: Optional[Intervals] = None
+    ) -> Optional[datetime.date]:
+        """Get the date identifying the period of `get_summed_quantities`, or `None` if it's for all time"""
+        interval = self.get_summed_quantities_interval(interval)
+        if date and self.has_interval and interval < Intervals(self.interval):
+            # the limits of the project are then scaled depending on the exact date (a week can be on two months)
+            return date
+        if dates := self.get_summed_quantities_dates(date, interval):
+            return dates[0]
+        return None
+
+    def get_summed_quantities_cache_key(
+        self,
+        date: Optional[datetime.date] = None,
+        interval: Optional[Intervals] = None,
+        version: Optional[int] = None,
+    ) -> str:
+        """Get the key to cache the result of `get_summed_quantities`, for the current data version of the project"""
+        interval = self.get_summed_quantities_interval(interval)
+        period = self.get_summed_quantities_period(date, interval) or "all"
+        if version is None:
+            version = get_projects_versions([self.pk])[self.pk]
+        return f"summed-quantities:{self.pk}:{version}:{interval.value}:{period}"
+
+    @staticmethod
+    def summed_quantities_to_cache(summed_quantities: dict[Category, dict[str, int]]) -> dict[int, dict[str, int]]:
+        return {category.id: values for category, values in summed_quantities.items()}
+
+    def summed_quantities_from_cache(
+        self, cached_summed_quantities: Optional[dict[int, dict[str, int]]]
+    ) -> Optional[dict[Category, dict[str, int]]]:
+        if cached_summed_quantities is None or len(cached_summed_quantities) != len(self.cached_categories):
+            return None
+        try:
+            return {category: cached_summed_quantities[category.id] for category in self.cached_categories}
+        except KeyError:
+            return None
 
-            if is_root and not alltime and not no_details and self.has_interval_quantity:
-                res_cat |= {
-                    "interval_quantity": interval_quantity,
-                    "available": interval_quantity - res_cat["used"],
-                    "really_available": (
-                        really_available := interval_quantity
-                        - (res_cat["used_not_expected"] + res_cat["unexpected"] + res_cat["expected"])
-                    ),
-                    "total_unexpected": really_available + res_cat["used_not_expected"] + res_cat["unexpected"],
-                }
+    @timed("summed-quantities")
+    def get_summed_quantities(
+        self, date: Optional[datetime.date] = None, interval: Optional[Intervals] = None
+    ) -> dict[Category, dict[str, int]]:
+        versions = get_projects_versions([self.pk])
+        cache_key = self.get_summed_quantities_cache_key(date, interval, versions[self.pk])
+        if (summed_quantities := self.summed_quantities_from_cache(cache.get(cache_key))) is not None:
+            return summed_quantities
+
+        # the same computation asked meanwhile by other requests waits for this one instead of being done again
+        compute = partial(self.compute_cached_summed_quantities, date, interval, versions)
+        cached_summed_quantities = single_flight(
+            cache_key,
+            compute,
+            timeout=settings.SUMMED_QUANTITIES_CACHE_TIMEOUT,
+            wait=settings.SUMMED_QUANTITIES_SINGLE_FLIGHT_WAIT,
+        )
+        if (summed_quantities := self.summed_quantities_from_cache(cached_summed_quantities)) is None:
+            # computed by another request for other categories, that just changed
+            summed_quantities = self.summed_quantities_from_cache(compute())
+        return summed_quantities
+
+    def compute_cached_summed_quantities(
+        self, date: Optional[datetime.date], interval: Optional[Intervals], versions: dict[int, int]
+    ) -> dict[int, dict[str, int]]:
+        """Compute the result of `get_summed_quantities`, as cached, for the given data version of the project"""
+        # a past period is only computed once, then read from its snapshot
+        snapshot = PeriodSnapshot.objects.read([self], date, interval).get(self.pk)
+        if self.summed_quantities_from_cache(snapshot) is not None:
+            return snapshot
+        cached_summed_quantities = self.summed_quantities_to_cache(self.compute_summed_quantities(date, interval))
+        PeriodSnapshot.objects.save_later({self: cached_summed_quantities}, date, interval, versions)
+        return cached_summed_quantities
+
+    def compute_summed_quantities(
+        self, date: Optional[datetime.date] = None, interval: Optional[Intervals] = None
+    ) -> dict[Category, dict[str, int]]:
+        daily_totals = CategoryDailyTotal.objects.filter(category__project=self)
+        if dates := self.get_summed_quantities_dates(date, interval):
+            daily_totals = daily_totals.filter(date__gte=dates[0], date__lte=dates[1])
 
-            if self.goal_mode:
-                res_cat["goal_reached"] = False
-                if final_planned := (interval_quantity if is_root else 0) or res_cat.get("expected"):
-                    res_cat.update(
-                        {
-                            "goal_planned": final_planned,
-                            "goal_max_value": max(final_planned, res_cat["used"]),
-                            "gaol_diff": abs(res_cat["used"] - final_planned),
-                            "goal_reached": res_cat["used"] >= final_planned,
-                        }
-                    )
+        if get_rollup_engine() == "sql":
+            summed_values, subtree_summed_values = self.get_subtree_summed_values(daily_totals)
+            return self.roll_up_summed_quantities(summed_values, date, interval, subtree_summed_values)
 
-            else:
-                res_cat["limit_exceeded"] = False
+        summed_values = dict(
+            daily_totals.order_by()
+            .values("category_id")
+            .annotate(summed_values=Sum("total"))
+            .values_list("category_id", "summed_values")
+        )
+        return self.roll_up_summed_quantities(summed_values, date, interval)
+
+    def get_subtree_summed_values(
+        self, daily_totals: models.QuerySet[CategoryDailyTotal]
+    ) -> tuple[dict[int, int], dict[int, int]]:
+        """Sum the given daily totals by category, without and with the sub-categories, in a single query.
+
+        The totals of the sub-categories are found using the nested sets of MPTT: a category includes all the
+        categories of the same tree having their `lft` and `rght` between its own ones.
+        """
+
+        def summed(**filters):
+            return Coalesce(
+                Subquery(
+                    daily_totals.filter(**filters)
+                    .order_by()
+                    .values("category__tree_id")
+                    .annotate(summed_values=Sum("total"))
+                    .values("summed_values")
+                ),
+                0,
+            )
 
-                used_planned_overflow = res_cat.get("unexpected", 0)
-                if is_root and (max_unplanned := res_cat.get("total_unexpected")):
-                    used_in_unplanned = res_cat.get("used_not_expected", 0)
-                    used_unplanned = used_in_unplanned + used_planned_overflow
-                    res_cat["limit_exceeded"] = used_unplanned > max_unplanned
-                elif used_planned_overflow:
-                    res_cat["limit_exceeded"] = True
+        summed_values, subtree_summed_values = {}, {}
+        for category_id, self_used, used in self.categories.annotate(
+            self_used=summed(category_id=OuterRef("pk")),
+            used=summed(
+                category__tree_id=OuterRef("tree_id"),
+                category__lft__gte=OuterRef("lft"),
+                category__rght__lte=OuterRef("rght"),
+            ),
+        ).values_list("id", "self_used", "used"):
+            summed_values[category_id], subtree_summed_values[category_id] = self_used, used
+        return summed_values, subtree_summed_values
+
+    def get_summed_quantities_series(
+        self, start: datetime.date, end: datetime.date, interval: Optional[Intervals] = None
+    ) -> dict[datetime.date, dict[Category, dict[str, int]]]:
+        """Do `get_summed_quantities` for each period of `interval` from `start` to `end`, with a single query.
+
+        The result is keyed by the first day of each period, in chronological order, including periods without any
+        quantity.
+        """
+        interval = self.get_summed_quantities_interval(interval)
+        if interval == Intervals.none:
+            return {get_dates_interval(start, interval)[0]: self.get_summed_quantities(start, interval)}
+
+        periods = []
+        period_start, period_end = get_dates_interval(start, interval)
+        while period_start <= end:
+            periods.append(period_start)
+            period_start, period_end = get_dates_interval(period_end + timedelta(days=1), interval)
+        if not periods:
+            return {}
+
+        # the first day of the period of each daily total is stored, so we can filter and group on it directly
+        period_field = CategoryDailyTotal.get_period_field(interval)
+        summed_values = {period: {} for period in periods}
+        for period, category_id, value in (
+            CategoryDailyTotal.objects.filter(
+                category__project=self, **{f"{period_field}__gte": periods[0], f"{period_field}__lte": periods[-1]}
+            )
+            .order_by()
+            .annotate(period=F(period_field))
+            .values("period", "category_id")
+            .annotate(summed_values=Sum("total"))
+            .values_list("period", "category_id", "summed_values")
+        ):
+            summed_values[period][category_id] = value
+
+        return {
+            period: self.roll_up_summed_quantities(values, period, interval)
+            for period, values in summed_values.items()
+        }
+
+    def roll_up_summed_quantities(
+        self,
+        summed_values: dict[int, int],
+        date: Optional[datetime.date] = None,
+        interval: Optional[Intervals] = None,
+        subtree_summed_values: Optional[dict[int, int]] = None,
+    ) -> dict[Category, dict[str, int]]:
+        """Compute all the values of each category from the quantities summed by category id.
 
-        update_count(self.root_category, is_root=True)
+        If `subtree_summed_values` is given, it's the quantities summed by category id including the sub-categories,
+        so they don't have to be summed again while walking the tree.
+        """
+        interval = self.get_summed_quantities_interval(interval)
+        alltime = self.has_interval and interval == Intervals.none
+        no_details = alltime or self.has_interval and interval < Intervals(self.interval)
+
+        factor, interval_quantity = None, self.interval_quantity
+        if self.has_interval:
+            factor = Intervals(self.interval).count_in(interval, date)
+            if interval_quantity:
+                interval_quantity = round(interval_quantity * factor)
+
+        parameters = RollUpParameters(
+            details=not no_details,
+            factor=factor,
+            interval_quantity=interval_quantity,
+            has_interval_quantity=self.has_interval_quantity,
+            goal_mode=self.goal_mode,
+        )
 
-        return result
+        if subtree_summed_values is not None:
+            return roll_up_from_subtree_totals(
+                self.cached_categories._result_cache, summed_values, subtree_summed_values, parameters
+            )
+        if get_rollup_engine() == "numpy":
+            return roll_up_vectorized(self.cached_categories._result_cache, summed_values, parameters)
+        return roll_up_recursive(self.root_category, self.cached_categories._result_cache, summed_values, parameters)
 
     def get_previous_sibling(self):
-        siblings = self.owner.cached_projects._result_cache
-        try:
-            if not (self_index := siblings.index(self)):
-                raise IndexError
-            return siblings[self_index - 1]
-        except IndexError:
+        if not (position := self.owner.cached_projects_positions.get(self.pk)):
             return None
+        return self.owner.cached_projects._result_cache[position - 1]
 
     @cached_property
     def previous_sibling(self):
@@ -472,10 +936,9 @@ class Project(Orderable, models.Model):
 
     def get_next_sibling(self):
         siblings = self.owner.cached_projects._result_cache
-        try:
-            return siblings[siblings.index(self) + 1]
-        except IndexError:
+        if (position := self.owner.cached_projects_positions.get(self.pk)) is None or position + 1 >= len(siblings):
             return None
+        return siblings[position + 1]
 
     @cached_property
     def next_sibling(self):
@@ -597,6 +1060,58 @@ class Category(Orderable, MPTTModel):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # to know if the quantities have to follow the category in another project
+        instance._loaded_project_id = instance.project_id
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if (loaded_project_id := getattr(self, "_loaded_project_id", None)) not in (None, self.project_id):
+                self.quantities.update(project_id=self.project_id)
+                Project.objects.tree_changed(loaded_project_id)
+            self.tree_changed()
+        self._loaded_project_id = self.project_id
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self.tree_changed()
+        return result
+
+    def tree_changed(self):
+        tree_version = Project.objects.tree_changed(self.project_id)
+        if self._meta.get_field("project").is_cached(self):
+            self.project.tree_version = tree_version
+
+    def get_tree_row(self) -> tuple:
+        """Values of the fields of the category, to keep it in memory without the cost of a model instance"""
+        return tuple(self.__dict__[attname] for attname in self.get_tree_row_attnames())
+
+    @classmethod
+    def get_tree_row_attnames(cls) -> list[str]:
+        return [field.attname for field in cls._meta.concrete_fields]
+
+    @classmethod
+    def from_tree_row(cls, project: Project, row: tuple) -> Category:
+        """Create a category from the values returned by `get_tree_row`, as if it was fetched from the database.
+
+        The instance is filled directly, without `__init__` and its many `__setattr__` (slow because of `Orderable`),
+        so we do ourselves what `from_db` and `MPTTModel.__init__` would do.
+        """
+        category = cls.__new__(cls)
+        category.__dict__.update(zip(cls.get_tree_row_attnames(), row))
+        category._state = ModelState()
+        category._state.adding = False
+        category._state.db = project._state.db
+        category._loaded_project_id = project.pk
+        category._mptt_meta.update_mptt_cached_fields(category)
+        cls._meta.get_field("project").set_cached_value(category, project)
+        return category
+
     def validate_constraints(self, exclude=None):
         if exclude and self.project_id:
             # to allow checking the constraints related to the project
@@ -633,13 +1148,7 @@ class Category(Orderable, MPTTModel):
     def get_previous_sibling(self, *filter_args, **filter_kwargs):
         if filter_args or filter_kwargs:
             return super().get_previous_sibling(*filter_args, **filter_kwargs)
-        siblings = self.get_siblings(include_self=True)._result_cache
-        try:
-            if not (self_index := siblings.index(self)):
-                raise IndexError
-            return siblings[self_index - 1]
-        except IndexError:
-            return None
+        return self.project.categories_index.get_sibling(self, -1)
 
     @cached_property
     def previous_sibling(self):
@@ -648,11 +1157,7 @@ class Category(Orderable, MPTTModel):
     def get_next_sibling(self, *filter_args, **filter_kwargs):
         if filter_args or filter_kwargs:
             return super().get_next_sibling(*filter_args, **filter_kwargs)
-        siblings = self.get_siblings(include_self=True)._result_cache
-        try:
-            return siblings[siblings.index(self) + 1]
-        except IndexError:
-            return None
+        return self.project.categories_index.get_sibling(self, 1)
 
     @cached_property
     def next_sibling(self):
@@ -692,6 +1197,30 @@ class Category(Orderable, MPTTModel):
             kwargs={"project_pk": self.project_id, "category_pk": self.pk},
         )
 
+    def get_edit_form_url(self):
+        return reverse(
+            "category_edit_form",
+            kwargs={"project_pk": self.project_id, "category_pk": self.pk},
+        )
+
+    def get_delete_form_url(self):
+        return reverse(
+            "category_delete_form",
+            kwargs={"project_pk": self.project_id, "category_pk": self.pk},
+        )
+
+    def get_add_quantity_form_url(self):
+        return reverse(
+            "quantity_in_category_create_form",
+            kwargs={"project_pk": self.project_id, "category_pk": self.pk},
+        )
+
+    def get_summary_url(self):
+        return reverse(
+            "category_summary",
+            kwargs={"project_pk": self.project_id, "category_pk": self.pk},
+        )
+
     def get_add_category_url(self):
         return reverse(
             "category_create",
@@ -704,6 +1233,12 @@ class Category(Orderable, MPTTModel):
             kwargs={"project_pk": self.project_id, "category_pk": self.pk},
         )
 
+    def get_quantities_export_url(self):
+        return reverse(
+            "quantities_export",
+            kwargs={"project_pk": self.project_id, "category_pk": self.pk},
+        )
+
 
 class Quantity(models.Model):
     """A quantity belongs to a category"""
@@ -714,6 +1249,8 @@ class Quantity(models.Model):
         related_name="quantities",
         verbose_name="In which category to save this quantity?",
     )
+    # the project of the category, to filter the quantities of a project without join
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="quantities", editable=False)
     notes = models.TextField(
         blank=True,
         verbose_name="Optional notes",
@@ -739,11 +1276,40 @@ class Quantity(models.Model):
 
     class Meta:
         verbose_name_plural = "quantities"
-        ordering = ["-date", "-time"]
+        ordering = ["-date", F("time").desc(nulls_last=True), "-id"]
         indexes = [
             models.Index(fields=["category", "date", "time"]),
+            models.Index(fields=["project", "date", "time"]),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # to know which daily totals to refresh if the category or the date change
+        instance._loaded_daily_total_key = (instance.category_id, instance.date)
+        return instance
+
+    @property
+    def daily_total_key(self):
+        return self.category_id, self.date
+
+    def save(self, *args, **kwargs):
+        self.project_id = self.category.project_id
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            keys = {self.daily_total_key, getattr(self, "_loaded_daily_total_key", None)}
+            CategoryDailyTotal.objects.refresh(keys)
+            Project.objects.data_changed(self.project_id, dates=[key[1] for key in keys if key])
+        self._loaded_daily_total_key = self.daily_total_key
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            keys = {self.daily_total_key, getattr(self, "_loaded_daily_total_key", None)}
+            CategoryDailyTotal.objects.refresh(keys)
+            Project.objects.data_changed(self.project_id, dates=[key[1] for key in keys if key])
+        return result
+
     @property
     def date_or_datetime(self):
         return datetime.combine(self.date, self.time) if self.time else self.date
@@ -751,11 +1317,263 @@ class Quantity(models.Model):
     def get_edit_url(self):
         return reverse(
             "quantity_edit",
-            kwargs={"project_pk": self.category.project_id, "category_pk": self.category_id, "quantity_pk": self.pk},
+            kwargs={"project_pk": self.project_id, "category_pk": self.category_id, "quantity_pk": self.pk},
         )
 
     def get_delete_url(self):
         return reverse(
             "quantity_delete",
-            kwargs={"project_pk": self.category.project_id, "category_pk": self.category_id, "quantity_pk": self.pk},
+            kwargs={"project_pk": self.project_id, "category_pk": self.category_id, "quantity_pk": self.pk},
+        )
+
+    def get_edit_form_url(self):
+        return reverse(
+            "quantity_edit_form",
+            kwargs={"project_pk": self.project_id, "category_pk": self.category_id, "quantity_pk": self.pk},
+        )
+
+    def get_delete_form_url(self):
+        return reverse(
+            "quantity_delete_form",
+            kwargs={"project_pk": self.project_id, "category_pk": self.category_id, "quantity_pk": self.pk},
+        )
+
+
+class CategoryDailyTotalManager(models.Manager):
+    def compute(self, quantities: models.QuerySet[Quantity]) -> dict[tuple[int, datetime.date], tuple[int, int]]:
+        """Get the total and count of the given quantities, by category id and date"""
+        return {
+            (category_id, date): (total, count)
+            for category_id, date, total, count in quantities.order_by()
+            .values("category_id", "date")
+            .annotate(total=Sum("value"), count=Count("id"))
+            .values_list("category_id", "date", "total", "count")
+        }
+
+    def save_totals(self, totals: dict[tuple[int, datetime.date], tuple[int, int]]):
+        """Create or update the daily totals for the given keys"""
+        self.bulk_create(
+            [
+                self.model(category_id=category_id, date=date, total=total, count=count, **get_period_starts(date))
+                for (category_id, date), (total, count) in totals.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["category", "date"],
+            update_fields=["total", "count"],
+        )
+
+    def refresh(self, keys: Iterable[Optional[tuple[int, datetime.date]]]):
+        """Recompute the daily totals for the given `(category_id, date)` keys from the quantities"""
+        if not (keys := {key for key in keys if key and all(key)}):
+            return
+        category_ids, dates = {key[0] for key in keys}, {key[1] for key in keys}
+        # a range of dates instead of the list of dates, to keep the query small when many keys are refreshed
+        filters = dict(category_id__in=category_ids, date__gte=min(dates), date__lte=max(dates))
+
+        with transaction.atomic():
+            totals = {
+                key: value for key, value in self.compute(Quantity.objects.filter(**filters)).items() if key in keys
+            }
+            if to_delete := [
+                pk
+                for pk, category_id, date in self.filter(**filters).values_list("pk", "category_id", "date")
+                if (category_id, date) in keys and (category_id, date) not in totals
+            ]:
+                self.filter(pk__in=to_delete).delete()
+            if totals:
+                self.save_totals(totals)
+
+    def rebuild(self, categories: Optional[models.QuerySet[Category]] = None) -> tuple[int, int]:
+        """Recompute all the daily totals (of the given categories if any) and fix the ones that drifted.
+
+        Return the number of daily totals created or updated, and the number of deleted ones.
+        """
+        quantities, daily_totals = Quantity.objects.all(), self.all()
+        if categories is not None:
+            quantities, daily_totals = quantities.filter(category__in=categories), daily_totals.filter(
+                category__in=categories
+            )
+
+        with transaction.atomic():
+            expected = self.compute(quantities)
+            existing = {
+                (category_id, date): (pk, (total, count))
+                for pk, category_id, date, total, count in daily_totals.values_list(
+                    "pk", "category_id", "date", "total", "count"
+                )
+            }
+            if to_delete := [pk for key, (pk, _) in existing.items() if key not in expected]:
+                self.filter(pk__in=to_delete).delete()
+            if to_save := {
+                key: value for key, value in expected.items() if existing.get(key, (None, None))[1] != value
+            }:
+                self.save_totals(to_save)
+
+        return len(to_save), len(to_delete)
+
+
+class CategoryDailyTotal(models.Model):
+    """The total and count of the quantities of a category for a day.
+
+    Maintained on each quantity write, so that summing a period reads one row per category and day instead of
+    every quantity.
+    """
+
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="daily_totals")
+    date = models.DateField()
+    total = models.PositiveBigIntegerField(default=0)
+    count = models.PositiveIntegerField(default=0)
+    # first day of the periods of `date`, as done by `get_dates_interval`, to sum many periods by grouping on them
+    week_start = models.DateField(editable=False)
+    month_start = models.DateField(editable=False)
+    year_start = models.DateField(editable=False)
+
+    objects = CategoryDailyTotalManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name="%(app_label)s_%(class)s_category_date_uniq",
+                fields=("category", "date"),
+            ),
+        ]
+        indexes = [
+            # with the total, so that summing by period is done without reading the table
+            models.Index(fields=["category", "week_start", "total"]),
+            models.Index(fields=["category", "month_start", "total"]),
+            models.Index(fields=["category", "year_start", "total"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        for field_name, period_start in get_period_starts(self.date).items():
+            setattr(self, field_name, period_start)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def get_period_field(interval: Intervals) -> str:
+        """Get the name of the field holding the first day of the period of the given interval"""
+        if interval == Intervals.daily:
+            return "date"
+        return f"{interval.unit_name}_start"
+
+    def __str__(self):
+        return f"{self.category_id} @ {self.date}: {self.total} ({self.count})"
+
+
+class PeriodSnapshotManager(models.Manager):
+    # above this number of changed dates, the snapshots of all the periods between them are deleted, to keep the
+    # query small
+    max_invalidated_dates = 10
+
+    @staticmethod
+    def get_key(
+        project: Project, date: Optional[datetime.date] = None, interval: Optional[Intervals] = None
+    ) -> Optional[tuple[Intervals, datetime.date]]:
+        """Get the interval and the date identifying the snapshot of `project.get_summed_quantities(date, interval)`,
+        or `None` if its period is not over, in which case it's not snapshotted"""
+        if not (dates := project.get_summed_quantities_dates(date, interval)) or dates[1] >= datetime.now().date():
+            return None
+        return project.get_summed_quantities_interval(interval), project.get_summed_quantities_period(date, interval)
+
+    def read(
+        self, projects: Iterable[Project], date: Optional[datetime.date] = None, interval: Optional[Intervals] = None
+    ) -> dict[int, dict[int, dict[str, int]]]:
+        """Get the snapshotted summed quantities of the given projects for the period, as cached, by project id"""
+        if not (keys := {project.pk: key for project in projects if (key := self.get_key(project, date, interval))}):
+            return {}
+        snapshots = self.filter(
+            reduce(
+                or_,
+                (Q(project_id=project_id, interval=key[0], date=key[1]) for project_id, key in keys.items()),
+            )
         )
+        return {
+            project_id: {int(category_id): values for category_id, values in data.items()}
+            for project_id, data in snapshots.values_list("project_id", "data")
+        }
+
+    def save_later(
+        self,
+        summed_quantities: dict[Project, dict[int, dict[str, int]]],
+        date: Optional[datetime.date],
+        interval: Optional[Intervals],
+        versions: dict[int, int],
+    ):
+        """Snapshot the summed quantities (as cached) of the projects for the period if it's over.
+
+        It's done once the current transaction is committed, and only for the projects whose data version is still
+        the one of `versions`, read before computing them, so that a snapshot is never older than a write.
+        """
+        snapshots = []
+        for project, data in summed_quantities.items():
+            if key := self.get_key(project, date, interval):
+                start_date, end_date = project.get_summed_quantities_dates(date, interval)
+                snapshots.append(
+                    self.model(
+                        project_id=project.pk,
+                        interval=key[0],
+                        date=key[1],
+                        start_date=start_date,
+                        end_date=end_date,
+                        data=data,
+                    )
+                )
+        if snapshots:
+            transaction.on_commit(partial(self.save_snapshots, snapshots, versions))
+
+    def save_snapshots(self, snapshots: list[PeriodSnapshot], versions: dict[int, int]):
+        current_versions = get_projects_versions(versions)
+        if snapshots := [
+            snapshot
+            for snapshot in snapshots
+            if current_versions[snapshot.project_id] == versions[snapshot.project_id]
+        ]:
+            self.bulk_create(
+                snapshots,
+                update_conflicts=True,
+                unique_fields=["project", "interval", "date"],
+                update_fields=["start_date", "end_date", "data"],
+            )
+
+    def invalidate(self, project_id: int, dates: Optional[Iterable[datetime.date]] = None):
+        """Delete the snapshots of the project, or only the ones of the periods including one of `dates` if given"""
+        snapshots = self.filter(project_id=project_id)
+        if dates is not None:
+            if not (dates := {date for date in dates if date}):
+                return
+            if len(dates) > self.max_invalidated_dates:
+                snapshots = snapshots.filter(start_date__lte=max(dates), end_date__gte=min(dates))
+            else:
+                snapshots = snapshots.filter(
+                    reduce(or_, (Q(start_date__lte=date, end_date__gte=date) for date in dates))
+                )
+        snapshots.delete()
+
+
+class PeriodSnapshot(models.Model):
+    """The summed quantities of a project for a period that is over, as cached by `Project.get_summed_quantities`.
+
+    Unlike the cache, it's kept when the data of the project changes, except for the quantities of its period or for
+    the categories and the project themselves, so that a past period is only computed once.
+    """
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="period_snapshots")
+    interval = models.CharField(max_length=10, choices=Intervals.choices)
+    # as returned by `Project.get_summed_quantities_period`, usually the first day of the period
+    date = models.DateField()
+    start_date = models.DateField()
+    end_date = models.DateField()
+    data = models.JSONField()
+
+    objects = PeriodSnapshotManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name="%(app_label)s_%(class)s_project_interval_date_uniq",
+                fields=("project", "interval", "date"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} @ {self.interval} {self.date}"
@@ -0,0 +1,90 @@
+from datetime import date, datetime, time
+from typing import Optional
+
+from django.db.models import F, Q, QuerySet
+
+
+class QuantityKeysetPage:
+    """A page of quantities, found from the last quantity of the previous page instead of an offset.
+
+    Quantities are ordered by descending date, time (without time last) and id. A page is asked with a "cursor" of
+    the quantity just before (`newer`) or just after (`older`) it, so the database only has to seek this position in
+    the index, and there is no need to count all the quantities.
+    """
+
+    ordering = (F("date").desc(), F("time").desc(nulls_last=True), F("id").desc())
+    reverse_ordering = (F("date").asc(), F("time").asc(nulls_first=True), F("id").asc())
+
+    def __init__(self, queryset: QuerySet, per_page: int, older: Optional[str] = None, newer: Optional[str] = None):
+        self.per_page = per_page
+        self.has_older = self.has_newer = False
+
+        if newer and (cursor := self.parse_cursor(newer)):
+            # we read backward from the cursor then put the quantities back in order
+            object_list = list(
+                queryset.filter(self.newer_filter(*cursor)).order_by(*self.reverse_ordering)[: per_page + 1]
+            )
+            self.has_newer = len(object_list) > per_page
+            self.object_list = object_list[:per_page][::-1]
+            self.has_older = True
+        else:
+            if older and (cursor := self.parse_cursor(older)):
+                queryset = queryset.filter(self.older_filter(*cursor))
+                self.has_newer = True
+            object_list = list(queryset.order_by(*self.ordering)[: per_page + 1])
+            self.has_older = len(object_list) > per_page
+            self.object_list = object_list[:per_page]
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_other_pages(self) -> bool:
+        return self.has_older or self.has_newer
+
+    @staticmethod
+    def get_cursor(quantity) -> str:
+        return f"{quantity.date.isoformat()}_{quantity.time.isoformat() if quantity.time else ''}_{quantity.pk}"
+
+    @staticmethod
+    def parse_cursor(cursor: str) -> Optional[tuple[date, Optional[time], int]]:
+        try:
+            date_str, time_str, pk = cursor.split("_")
+            return (
+                datetime.strptime(date_str, "%Y-%m-%d").date(),
+                time.fromisoformat(time_str) if time_str else None,
+                int(pk),
+            )
+        except ValueError:
+            return None
+
+    @property
+    def older_cursor(self) -> Optional[str]:
+        return self.get_cursor(self.object_list[-1]) if self.has_older else None
+
+    @property
+    def newer_cursor(self) -> Optional[str]:
+        return self.get_cursor(self.object_list[0]) if self.has_newer else None
+
+    @staticmethod
+    def older_filter(date_: date, time_: Optional[time], pk: int) -> Q:
+        """Filter the quantities coming after the cursor in the ordering"""
+        if time_ is None:
+            same_date = Q(time__isnull=True, id__lt=pk)
+        else:
+            same_date = Q(time__lt=time_) | Q(time__isnull=True) | Q(time=time_, id__lt=pk)
+        return Q(date__lt=date_) | (Q(date=date_) & same_date)
+
+    @staticmethod
+    def newer_filter(date_: date, time_: Optional[time], pk: int) -> Q:
+        """Filter the quantities coming before the cursor in the ordering"""
+        if time_ is None:
+            same_date = Q(time__isnull=False) | Q(time__isnull=True, id__gt=pk)
+        else:
+            same_date = Q(time__gt=time_) | Q(time=time_, id__gt=pk)
+        return Q(date__gt=date_) | (Q(date=date_) & same_date)
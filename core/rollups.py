@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+if TYPE_CHECKING:
+    from .models import Category
+
+
+DETAILS_KEYS = ["used_not_expected", "expected", "unexpected", "expected_not_used"]
+
+
+class RollUpParameters(NamedTuple):
+    """What the roll-up of the summed quantities of a project needs to know about the project and the period"""
+
+    details: bool
+    factor: Optional[float]
+    interval_quantity: Optional[int]
+    has_interval_quantity: bool
+    goal_mode: bool
+
+    def scale(self, quantity: Optional[int]) -> Optional[int]:
+        """Scale a quantity defined for the interval of the project to the interval of the period"""
+        if quantity and self.factor is not None:
+            return round(quantity * self.factor)
+        return quantity
+
+
+def get_rollup_engine() -> str:
+    engine = settings.SUMMED_QUANTITIES_ROLLUP
+    if engine not in ("python", "sql", "numpy"):
+        raise ImproperlyConfigured(f"Invalid SUMMED_QUANTITIES_ROLLUP: {engine!r}")
+    if engine == "numpy" and numpy is None:
+        raise ImproperlyConfigured('SUMMED_QUANTITIES_ROLLUP is "numpy" but numpy is not installed')
+    return engine
+
+
+def set_self_values(res_cat: dict[str, int], expected_quantity: Optional[int]):
+    if expected_quantity:
+        res_cat["self_used_not_expected"] = 0
+        res_cat["self_expected"] = expected_quantity
+        res_cat["self_unexpected"] = max(0, res_cat["self_used"] - res_cat["self_expected"])
+        res_cat["self_expected_not_used"] = (
+            res_cat["self_expected"] - res_cat["self_used"] + res_cat["self_unexpected"]
+        )
+    else:
+        res_cat["self_used_not_expected"] = res_cat["self_used"]
+        res_cat["self_expected"] = res_cat["self_unexpected"] = res_cat["self_expected_not_used"] = 0
+
+
+def set_expected_values(res_cat: dict[str, int]):
+    """Set the values of a category having an expected quantity, once its `used` value is known"""
+    for key in ["used_not_expected", "expected"]:
+        res_cat[key] = res_cat[f"self_{key}"]
+    res_cat["unexpected"] = max(0, res_cat["used"] - res_cat["self_expected"])
+    res_cat["expected_not_used"] = res_cat["expected"] - res_cat["used"] + res_cat["unexpected"]
+
+
+def set_final_values(res_cat: dict[str, int], parameters: RollUpParameters, is_root: bool):
+    """Set the limit and goal values of a category, once all its other values are known"""
+    interval_quantity = parameters.interval_quantity
+
+    if is_root and parameters.details and parameters.has_interval_quantity:
+        res_cat |= {
+            "interval_quantity": interval_quantity,
+            "available": interval_quantity - res_cat["used"],
+            "really_available": (
+                really_available := interval_quantity
+                - (res_cat["used_not_expected"] + res_cat["unexpected"] + res_cat["expected"])
+            ),
+            "total_unexpected": really_available + res_cat["used_not_expected"] + res_cat["unexpected"],
+        }
+
+    if parameters.goal_mode:
+        res_cat["goal_reached"] = False
+        if final_planned := (interval_quantity if is_root else 0) or res_cat.get("expected"):
+            res_cat.update(
+                {
+                    "goal_planned": final_planned,
+                    "goal_max_value": max(final_planned, res_cat["used"]),
+                    "gaol_diff": abs(res_cat["used"] - final_planned),
+                    "goal_reached": res_cat["used"] >= final_planned,
+                }
+            )
+
+    else:
+        res_cat["limit_exceeded"] = False
+
+        used_planned_overflow = res_cat.get("unexpected", 0)
+        if is_root and (max_unplanned := res_cat.get("total_unexpected")):
+            used_in_unplanned = res_cat.get("used_not_expected", 0)
+            used_unplanned = used_in_unplanned + used_planned_overflow
+            res_cat["limit_exceeded"] = used_unplanned > max_unplanned
+        elif used_planned_overflow:
+            res_cat["limit_exceeded"] = True
+
+
+def roll_up_recursive(
+    root_category: Category,
+    categories: list[Category],
+    summed_values: dict[int, int],
+    parameters: RollUpParameters,
+) -> dict[Category, dict[str, int]]:
+    """Roll-up the summed quantities by walking the tree from the root, summing the values of the children"""
+    result = {category: {"self_used": summed_values.get(category.id, 0)} for category in categories}
+
+    def update_count(category, is_root=False):
+        for sub_category in (children := category.get_children()):
+            update_count(sub_category)
+
+        res_cat = result[category]
+        expected_quantity = parameters.scale(category.expected_quantity)
+        set_self_values(res_cat, expected_quantity)
+
+        keys = ["used"]
+        if parameters.details:
+            if expected_quantity:
+                res_cat["used"] = res_cat["self_used"] + sum(
+                    result[sub_category]["used"] for sub_category in children
+                )
+                set_expected_values(res_cat)
+            else:
+                keys.extend(DETAILS_KEYS)
+
+        for key in keys:
+            res_cat[key] = res_cat[f"self_{key}"] + sum(result[sub_category][key] for sub_category in children)
+
+        set_final_values(res_cat, parameters, is_root)
+
+    update_count(root_category, is_root=True)
+
+    return result
+
+
+def roll_up_from_subtree_totals(
+    categories: list[Category],
+    summed_values: dict[int, int],
+    subtree_summed_values: dict[int, int],
+    parameters: RollUpParameters,
+) -> dict[Category, dict[str, int]]:
+    """Roll-up the summed quantities when the `used` value of each subtree is already known.
+
+    The categories, in MPTT order, are read backward so that each category is done after all its descendants, and
+    adds its values to the totals of its parent. So no category has to sum the values of its children.
+    """
+    result = {}
+    children_totals = defaultdict(lambda: dict.fromkeys(DETAILS_KEYS, 0))
+
+    for category in reversed(categories):
+        res_cat = result[category] = {"self_used": summed_values.get(category.id, 0)}
+        expected_quantity = parameters.scale(category.expected_quantity)
+        set_self_values(res_cat, expected_quantity)
+        res_cat["used"] = subtree_summed_values.get(category.id, 0)
+
+        if parameters.details:
+            if expected_quantity:
+                set_expected_values(res_cat)
+            else:
+                totals = children_totals.pop(category.id, None) or {}
+                for key in DETAILS_KEYS:
+                    res_cat[key] = res_cat[f"self_{key}"] + totals.get(key, 0)
+
+            if category.parent_id:
+                parent_totals = children_totals[category.parent_id]
+                for key in DETAILS_KEYS:
+                    parent_totals[key] += res_cat[key]
+
+        set_final_values(res_cat, parameters, is_root=not category.parent_id)
+
+    return {category: result[category] for category in categories}
+
+
+def roll_up_vectorized(
+    categories: list[Category],
+    summed_values: dict[int, int],
+    parameters: RollUpParameters,
+) -> dict[Category, dict[str, int]]:
+    """Roll-up the summed quantities with numpy, using arrays of the categories in MPTT order.
+
+    The values of the subtrees are summed level by level, from the deepest one, each level adding its values to the
+    ones of its parents, then all the derived values are computed at once for all the categories.
+    """
+    index = {category.id: position for position, category in enumerate(categories)}
+    parents = numpy.array([index.get(category.parent_id, -1) for category in categories])
+    levels = numpy.array([category.level for category in categories])
+    self_used = numpy.array([summed_values.get(category.id, 0) for category in categories], dtype=numpy.int64)
+    expected = numpy.array(
+        [parameters.scale(category.expected_quantity) or 0 for category in categories], dtype=numpy.int64
+    )
+    has_expected = expected != 0
+    is_root = parents == -1
+    zeros = numpy.zeros_like(self_used)
+
+    self_values = {
+        "self_used_not_expected": numpy.where(has_expected, 0, self_used),
+        "self_expected": expected,
+        "self_unexpected": (self_unexpected := numpy.where(has_expected, numpy.maximum(0, self_used - expected), 0)),
+        "self_expected_not_used": numpy.where(has_expected, expected - self_used + self_unexpected, 0),
+    }
+
+    # nodes of each level, from the deepest one, without the root as it has no parent to add its values to
+    levels_nodes = [numpy.flatnonzero(levels == level) for level in range(levels.max(), levels.min(), -1)]
+
+    used = self_used.copy()
+    for nodes in levels_nodes:
+        numpy.add.at(used, parents[nodes], used[nodes])
+
+    values = {"used": used}
+    if parameters.details:
+        unexpected = numpy.maximum(0, used - expected)
+        values |= {
+            "used_not_expected": numpy.where(has_expected, 0, self_values["self_used_not_expected"]),
+            "expected": expected.copy(),
+            "unexpected": numpy.where(has_expected, unexpected, 0),
+            "expected_not_used": numpy.where(has_expected, expected - used + unexpected, 0),
+        }
+        # categories with an expected quantity don't include the values of their children, except for `used`
+        for nodes in levels_nodes:
+            nodes = nodes[~has_expected[parents[nodes]]]
+            for key in DETAILS_KEYS:
+                numpy.add.at(values[key], parents[nodes], values[key][nodes])
+
+    final_values = {}
+    if parameters.goal_mode:
+        planned = values["expected"] if parameters.details else zeros
+        with_goal = planned != 0
+        final_values = {
+            "goal_planned": planned,
+            "goal_max_value": numpy.maximum(planned, used),
+            "gaol_diff": numpy.abs(used - planned),
+            "goal_reached": with_goal & (used >= planned),
+        }
+    else:
+        final_values["limit_exceeded"] = (values["unexpected"] if parameters.details else zeros) != 0
+
+    columns = {key: array.tolist() for key, array in (self_values | values | final_values).items()}
+    columns["self_used"] = self_used.tolist()
+    keys = list(columns)
+    goal_keys = {"goal_planned", "goal_max_value", "gaol_diff"}
+    with_goal = with_goal.tolist() if parameters.goal_mode else None
+    is_root = is_root.tolist()
+
+    result = {}
+    for position, category in enumerate(categories):
+        res_cat = result[category] = {key: columns[key][position] for key in keys}
+        if parameters.goal_mode and not with_goal[position]:
+            for key in goal_keys:
+                del res_cat[key]
+        if is_root[position]:
+            # the root may depend on the limit of the project
+            for key in goal_keys | {"goal_reached", "limit_exceeded"}:
+                res_cat.pop(key, None)
+            set_final_values(res_cat, parameters, is_root=True)
+
+    return result
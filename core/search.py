@@ -0,0 +1,94 @@
+from django.db import connections
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+
+# the FTS5 table indexing the notes of the quantities with SQLite, its rows having the ids of the quantities
+NOTES_SEARCH_TABLE = "core_quantity_notes_search"
+# the text search configuration used with PostgreSQL, without stemming nor stop words as the notes can be in any
+# language, like the FTS5 tokenizer
+NOTES_SEARCH_CONFIG = "simple"
+NOTES_SEARCH_INDEX = "core_quantity_notes_search"
+
+
+def get_notes_search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector("notes", config=NOTES_SEARCH_CONFIG)
+
+
+def create_notes_search_triggers(schema_editor):
+    """Keep the FTS5 table in sync with the `core_quantity` table on each write, including the bulk ones.
+
+    The triggers are dropped when SQLite remakes the table to alter it, so they are created again after each migration
+    (see `CoreConfig.ready`), the table keeping the same rows.
+    """
+    table = NOTES_SEARCH_TABLE
+    schema_editor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON core_quantity BEGIN "
+        f"INSERT INTO {table}(rowid, notes) VALUES (new.id, new.notes); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON core_quantity BEGIN "
+        f"INSERT INTO {table}({table}, rowid, notes) VALUES ('delete', old.id, old.notes); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {table}_update AFTER UPDATE OF notes ON core_quantity BEGIN "
+        f"INSERT INTO {table}({table}, rowid, notes) VALUES ('delete', old.id, old.notes); "
+        f"INSERT INTO {table}(rowid, notes) VALUES (new.id, new.notes); END"
+    )
+
+
+def create_notes_search_index(apps, schema_editor):
+    """Create the index used by `search_quantities` for the database, if it has one"""
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        # the notes are not copied, the content of the table being the `core_quantity` table
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {NOTES_SEARCH_TABLE} USING fts5("
+            f"notes, content='core_quantity', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(f"INSERT INTO {NOTES_SEARCH_TABLE}({NOTES_SEARCH_TABLE}) VALUES ('rebuild')")
+        create_notes_search_triggers(schema_editor)
+    elif vendor == "postgresql":
+        from django.contrib.postgres.indexes import GinIndex
+
+        schema_editor.add_index(
+            apps.get_model("core", "Quantity"), GinIndex(get_notes_search_vector(), name=NOTES_SEARCH_INDEX)
+        )
+
+
+def drop_notes_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for trigger in ("insert", "delete", "update"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {NOTES_SEARCH_TABLE}_{trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {NOTES_SEARCH_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {NOTES_SEARCH_INDEX}")
+
+
+def search_quantities(queryset: QuerySet, text: str) -> QuerySet:
+    """Filter the quantities having in their notes all the words of the text, or words starting with them.
+
+    The index of the database is used with SQLite and PostgreSQL, the other databases scanning the notes.
+    """
+    if not (words := text.split()):
+        return queryset
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite":
+        # each word as a quoted string, so that nothing in it is taken as the syntax of the FTS5 queries
+        match = " ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {NOTES_SEARCH_TABLE} WHERE {NOTES_SEARCH_TABLE} MATCH %s", [match])
+        )
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery
+
+        # the same expression as the one of the index, so that it is used
+        query = " & ".join("'{}':*".format(word.replace("\\", "\\\\").replace("'", "''")) for word in words)
+        return queryset.annotate(notes_search=get_notes_search_vector()).filter(
+            notes_search=SearchQuery(query, config=NOTES_SEARCH_CONFIG, search_type="raw")
+        )
+    for word in words:
+        queryset = queryset.filter(notes__icontains=word)
+    return queryset
@@ -5,17 +5,18 @@ from django.contrib.auth import user_logged_in, user_logged_out
 from django.utils.translation import gettext_lazy as _
 
 
+# the messages fail silently for the requests without the messages middleware, like the ones of `Client.force_login`
 def on_user_logged_in(sender, request, user, **kwargs):
     if user.is_authenticated:
         if user.date_joined is not None and user.date_joined < datetime.now(timezone.utc) - timedelta(minutes=2):
-            messages.success(request, _("Welcome back, %(user)s!") % {"user": user.username})
+            messages.success(request, _("Welcome back, %(user)s!") % {"user": user.username}, fail_silently=True)
         else:
-            messages.success(request, _("Welcome, %(user)s!") % {"user": user.username})
+            messages.success(request, _("Welcome, %(user)s!") % {"user": user.username}, fail_silently=True)
     return None
 
 
 def on_user_logged_out(sender, request, user, **kwargs):
-    messages.info(request, _("You are now logged out!"))
+    messages.info(request, _("You are now logged out!"), fail_silently=True)
     return None
 
 
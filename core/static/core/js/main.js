@@ -21,11 +21,14 @@ document.addEventListener('DOMContentLoaded', () => {
     }, true);
 
     // focus on the first input field when a details element with "focus-first-input" class is opened
+    const focus_first_input = details => {
+        const container_selector = details.getAttribute('data-focus-first-input-in');
+        const input_selector = details.getAttribute('data-focus-first-input') || 'input:not([type="hidden"]),select,textarea';
+        (container_selector ? details.querySelector(container_selector) : details)?.querySelectorAll(input_selector)[0]?.focus();
+    };
     document.addEventListener('toggle', ev => {
         if (ev.target.nodeName === 'DETAILS' && ev.target.open && ev.target.classList.contains('focus-first-input')) {
-            const container_selector = ev.target.getAttribute('data-focus-first-input-in');
-            const input_selector = ev.target.getAttribute('data-focus-first-input') || 'input:not([type="hidden"]),select,textarea';
-            (container_selector ? ev.target.querySelector(container_selector) : ev.target)?.querySelectorAll(input_selector)[0]?.focus();
+            focus_first_input(ev.target);
         }
     }, true);
 
@@ -51,6 +54,91 @@ document.addEventListener('DOMContentLoaded', () => {
         create_select2(ev.target);
     });
 
+    // when a details element is opened for the first time, load the forms of the elements having a "data-form-url"
+    // attribute (but not the ones of the details elements inside it), as they are not rendered with the page
+    document.addEventListener('toggle', ev => {
+        if (ev.target.nodeName !== 'DETAILS' || !ev.target.open) {
+            return;
+        }
+        const details = ev.target;
+        details.querySelectorAll('[data-form-url]').forEach(el => {
+            if (el.closest('details') !== details) {
+                return;
+            }
+            const url = el.getAttribute('data-form-url');
+            el.removeAttribute('data-form-url');
+            el.setAttribute('data-form-loaded-url', url);
+            fetch(url, {credentials: 'same-origin'}).then(response => {
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.text();
+            }).then(html => {
+                el.innerHTML = html;
+                create_all_select2(el);
+                if (details.open && details.classList.contains('focus-first-input')) {
+                    focus_first_input(details);
+                }
+            }).catch(() => {
+                // to try again the next time it's opened
+                el.setAttribute('data-form-url', url);
+                el.innerHTML = '<span class="text-danger">The form could not be loaded, please close and open it again.</span>';
+            });
+        });
+    }, true);
+
+    // submit the forms having a "data-fragments" attribute in the background, asking only for the parts of the page
+    // they change (elements having a "data-fragment" attribute) to replace them, instead of loading the whole page
+    const replace_fragments = html => {
+        const template = document.createElement('template');
+        template.innerHTML = html;
+        template.content.querySelectorAll(':scope > [data-fragment]').forEach(fragment => {
+            document.querySelectorAll(`[data-fragment="${fragment.getAttribute('data-fragment')}"]`).forEach(el => {
+                el.replaceWith(fragment.cloneNode(true));
+            });
+        });
+    };
+    document.addEventListener('submit', ev => {
+        const form = ev.target;
+        const kind = form.getAttribute('data-fragments');
+        // a new quantity is not added to the list of quantities, so this page is loaded again
+        if (!kind || (kind === 'create' && document.querySelector('.quantities-list-container'))) {
+            return;
+        }
+        ev.preventDefault();
+        const container = form.parentElement;
+        fetch(form.action, {
+            method: 'POST',
+            body: new FormData(form),
+            credentials: 'same-origin',
+            headers: {'X-Fragments': '1'},
+        }).then(response => {
+            if (response.status === 400) {
+                // the form with its errors
+                return response.text().then(html => {
+                    container.innerHTML = html;
+                    create_all_select2(container);
+                });
+            }
+            if (!response.ok) {
+                // the quantity may have been saved or not, so the page is loaded again to see it
+                window.location.reload();
+                return;
+            }
+            return response.text().then(html => {
+                replace_fragments(html);
+                // close the dropdowns of the form, and load it again the next time, with the new initial values
+                for (let details = container.closest('details'); details; details = details.parentElement.closest('details')) {
+                    details.open = false;
+                }
+                if (container.hasAttribute('data-form-loaded-url')) {
+                    container.setAttribute('data-form-url', container.getAttribute('data-form-loaded-url'));
+                    container.innerHTML = '<span class="text-muted">Loading…</span>';
+                }
+            });
+        }, () => form.submit());  // without response, submitted normally
+    });
+
     // typeahead
     const filter_quick_categories = (text, list, list_item_selector, text_selector) => {
         const filter = text.toLowerCase();
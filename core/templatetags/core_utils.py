@@ -21,6 +21,7 @@ from core.forms import (
     QuantityInProjectForm,
 )
 from core.models import Intervals, get_interval_str, Project
+from core.timing import timed
 
 
 @register.filter
@@ -64,6 +65,7 @@ def cache_tree(categories):
 
 
 @register.inclusion_tag("project_form_include.html", takes_context=True)
+@timed("project_form")
 def project_form(context, project=None, next_category=None):
     return {
         "date": context.get("date"),
@@ -75,6 +77,7 @@ def project_form(context, project=None, next_category=None):
 
 
 @register.inclusion_tag("project_delete_form_include.html", takes_context=True)
+@timed("project_delete_form")
 def project_delete_form(context, project, next_category=None):
     return {
         "date": context.get("date"),
@@ -86,6 +89,7 @@ def project_delete_form(context, project, next_category=None):
 
 
 @register.inclusion_tag("project_reorder_form_include.html", takes_context=True)
+@timed("project_reorder_form")
 def project_reorder_form(context, user, project, next_category=None):
     return {
         "date": context.get("date"),
@@ -97,6 +101,7 @@ def project_reorder_form(context, user, project, next_category=None):
 
 
 @register.inclusion_tag("category_form_include.html", takes_context=True)
+@timed("category_form")
 def category_form(context, project, parent_category=None, category=None, next_category=None):
     return {
         "date": context.get("date"),
@@ -110,6 +115,7 @@ def category_form(context, project, parent_category=None, category=None, next_ca
 
 
 @register.inclusion_tag("category_reorder_form_include.html", takes_context=True)
+@timed("category_reorder_form")
 def category_reorder_form(context, category, next_category=None):
     return {
         "date": context.get("date"),
@@ -121,6 +127,7 @@ def category_reorder_form(context, category, next_category=None):
 
 
 @register.inclusion_tag("category_delete_form_include.html", takes_context=True)
+@timed("category_delete_form")
 def category_delete_form(context, category, next_category=None):
     return {
         "date": context.get("date"),
@@ -132,6 +139,7 @@ def category_delete_form(context, category, next_category=None):
 
 
 @register.inclusion_tag("quantity_form_include.html", takes_context=True)
+@timed("quantity_in_category_form")
 def quantity_in_category_form(context, category, next_category=None, initial_value=None):
     initial_date = QuantityInCategoryForm.get_initial_date(
         context.get("date"), context.get("interval") or category.project.interval
@@ -154,6 +162,7 @@ def quantity_in_category_form(context, category, next_category=None, initial_val
 
 
 @register.inclusion_tag("quantity_form_include.html", takes_context=True)
+@timed("quantity_in_project_form")
 def quantity_in_project_form(context, project, back_to_project=False, initial_value=None):
     initial_date = QuantityInProjectForm.get_initial_date(
         context.get("date"), context.get("interval") or project.interval
@@ -175,6 +184,7 @@ def quantity_in_project_form(context, project, back_to_project=False, initial_va
 
 
 @register.inclusion_tag("quantity_form_include.html", takes_context=True)
+@timed("quantity_edit_form")
 def quantity_edit_form(context, quantity, next_category=None, next_with_children=True):
     category = quantity.category
     return {
@@ -189,6 +199,7 @@ def quantity_edit_form(context, quantity, next_category=None, next_with_children
 
 
 @register.inclusion_tag("quantity_delete_form_include.html", takes_context=True)
+@timed("quantity_delete_form")
 def quantity_delete_form(context, quantity, next_category=None, next_with_children=True):
     return {
         "date": context.get("date"),
@@ -283,6 +294,7 @@ def extend_texts_or_bars(list_, func, args):
 
 
 @register.inclusion_tag("gauge.html", takes_context=True)
+@timed("gauge")
 def gauge(context, obj, summed_quantities):
     project = context["project"]
     if project.goal_mode and not summed_quantities.get("goal_planned"):
@@ -1,3 +1,147 @@
-from django.test import TestCase
+import io
+from datetime import datetime, timedelta
+from unittest import skipIf
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+
+from . import rollups
+from .models import Intervals, Quantity, User
+
+# arguments of the `generate_data` command for each scale, the user of each scale being the scale followed by "1"
+SCALES = {
+    "small": dict(depth=2, fan_out=2, quantities=60),
+    "large": dict(depth=3, fan_out=4, quantities=600),
+}
+
+
+@override_settings(CATEGORIES_TREE_CACHE_SIZE=0)
+class QueriesBudgetTestCase(TestCase):
+    """The number of queries of each page must not grow with the number of categories or quantities.
+
+    Each page is rendered with nothing in cache, for a past year so that there are quantities to list at both
+    scales.
+    """
+
+    # maximum number of queries of the main pages, by name of their url: the session, the user, the projects, the
+    # categories, the period snapshot and the summed quantities, then the count and the page of the quantities
+    budgets = {
+        "projects": 5,
+        "project_details": 6,
+        "category_details": 6,
+        "quantities_list": 8,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        for prefix, options in SCALES.items():
+            call_command("generate_data", prefix=prefix, years=2, stdout=io.StringIO(), **options)
+        cls.query = {"date": datetime.now().date() - timedelta(days=365), "interval": "yearly"}
+
+    def get_paths(self, user: User) -> dict[tuple[str, tuple[str, ...]], str]:
+        """Get the path of each page of the user, by name and arguments of its url.
+
+        The pages are the ones of `quantifier/urls.py` having only a project, a category or a quantity as arguments.
+        """
+        project = user.projects.get(interval="monthly", goal_mode=False)
+        category = project.categories.get(level=1, sort_order=1)
+        quantity = Quantity.objects.filter(project=project, category__parent=category).first()
+
+        paths = {}
+        for pattern in get_resolver().url_patterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            names = tuple(sorted(pattern.pattern.regex.groupindex))
+            values = {
+                "project_pk": project.pk,
+                "category_pk": quantity.category_id if "quantity_pk" in names else category.pk,
+                "quantity_pk": quantity.pk,
+            }
+            if set(names) <= set(values):
+                paths[(pattern.name, names)] = reverse(pattern.name, kwargs={name: values[name] for name in names})
+        return paths
+
+    def count_queries(self, user: User) -> dict[tuple[str, tuple[str, ...]], int]:
+        """Render each page of the user and count its queries, by name and arguments of its url"""
+        self.client.force_login(user)
+        result = {}
+        for key, path in self.get_paths(user).items():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(path, self.query)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            self.assertEqual(response.status_code, 200, path)
+            result[key] = len(queries)
+        return result
+
+    def assert_budgets(self):
+        small = self.count_queries(User.objects.get(username="small1"))
+        large = self.count_queries(User.objects.get(username="large1"))
+
+        self.assertEqual(small.keys(), large.keys())
+        for (name, names), nb_queries in large.items():
+            with self.subTest(name=name, arguments=names):
+                self.assertEqual(nb_queries, small[(name, names)], "The number of queries depends on the data")
+                if name in self.budgets:
+                    self.assertLessEqual(nb_queries, self.budgets[name])
+
+        self.assertTrue(self.budgets.keys() <= {name for name, _ in large})
+
+    def test_budgets(self):
+        self.assert_budgets()
+
+    @override_settings(QUANTITIES_PAGINATION="keyset")
+    def test_budgets_keyset_pagination(self):
+        self.assert_budgets()
+
+    @override_settings(SUMMED_QUANTITIES_ROLLUP="sql")
+    def test_budgets_sql_rollup(self):
+        self.assert_budgets()
+
+
+@skipIf(rollups.numpy is None, "numpy is not installed")
+class RollUpEnginesTestCase(TestCase):
+    """The roll-up of the summed quantities must give the same values for each category with each engine: the
+    recursive one (`python`), the vectorized one (`numpy`) and the one from the totals of the subtrees (`sql`).
+
+    It's checked for trees of several shapes, for each timeframe of the projects, with and without goal mode, and for
+    each interval that can be asked for them.
+    """
+
+    # arguments of the `generate_data` command for each shape of tree, the user of each shape being its name followed
+    # by "1"
+    shapes = {
+        "flat": dict(depth=1, fan_out=6, quantities=100),
+        "narrow": dict(depth=4, fan_out=2, quantities=200),
+        "wide": dict(depth=2, fan_out=5, quantities=200),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        for prefix, options in cls.shapes.items():
+            call_command("generate_data", prefix=prefix, years=2, stdout=io.StringIO(), **options)
+
+    def test_engines(self):
+        today = datetime.now().date()
+        for user in User.objects.filter(username__in=[f"{prefix}1" for prefix in self.shapes]):
+            for project in user.projects.all():
+                for date in (today, today - timedelta(days=365)):
+                    for interval in Intervals:
+                        if project.has_interval and interval > Intervals(project.interval):
+                            continue
+                        with self.subTest(user=user.username, project=project.name, date=date, interval=interval):
+                            results = {}
+                            for engine in ("python", "numpy", "sql"):
+                                with self.settings(SUMMED_QUANTITIES_ROLLUP=engine):
+                                    results[engine] = project.compute_summed_quantities(date, interval)
+                            self.assertTrue(results["python"])
+                            for category, values in results["python"].items():
+                                self.assertEqual(results["numpy"][category], values, category)
+                                self.assertEqual(results["sql"][category], values, category)
+                            self.assertEqual(results["numpy"].keys(), results["python"].keys())
+                            self.assertEqual(results["sql"].keys(), results["python"].keys())
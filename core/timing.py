@@ -0,0 +1,110 @@
+import logging
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    """The total duration and the number of calls of the measured parts of a request, by name"""
+
+    def __init__(self):
+        self.durations: dict[str, float] = defaultdict(float)
+        self.counts: dict[str, int] = defaultdict(int)
+        # the parts being measured, to not count again the calls made inside them
+        self.running: set[str] = set()
+
+    def add(self, name: str, duration: float):
+        self.durations[name] += duration
+        self.counts[name] += 1
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add("sql", time.perf_counter() - start)
+
+
+# the timings of the current request, only if they are measured
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+def timed(name: str):
+    """Decorate a function to add its duration to the timings of the current request, if they are measured"""
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if (timings := current_timings.get()) is None or name in timings.running:
+                return function(*args, **kwargs)
+            timings.running.add(name)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings.running.discard(name)
+                timings.add(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class ServerTimingMiddleware:
+    """Measure the SQL queries, the rendering and the parts decorated by `timed` of each request.
+
+    They are sent in the `Server-Timing` header of the response, to be seen in the developer tools of the browsers,
+    and logged by the `core.timing` logger. Only used if the `SERVER_TIMING` setting is enabled.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        timings.add("total", time.perf_counter() - start)
+
+        response["Server-Timing"] = ", ".join(
+            f'{name};dur={duration * 1000:.1f};desc="{timings.counts[name]} call(s)"'
+            for name, duration in timings.durations.items()
+        )
+        logger.info(
+            "%s %s %s %s",
+            request.method,
+            request.path,
+            response.status_code,
+            " ".join(
+                f"{name}={duration * 1000:.1f}ms/{timings.counts[name]}"
+                for name, duration in timings.durations.items()
+            ),
+            extra={
+                "timings": {
+                    name: {"duration_ms": round(duration * 1000, 1), "count": timings.counts[name]}
+                    for name, duration in timings.durations.items()
+                }
+            },
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # the template is rendered by the handler after this, until the callbacks called once it's rendered
+        if (timings := current_timings.get()) is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(lambda response: timings.add("render", time.perf_counter() - start))
+        return response
@@ -1,7 +1,14 @@
+import asyncio
 import contextlib
+import csv
+import hashlib
+import io
+import json
 from datetime import datetime
-from functools import cached_property
-from typing import Optional
+from functools import cached_property, partial
+from typing import Any, Callable, Optional
+
+from asgiref.sync import async_to_sync, sync_to_async
 
 from django.conf import settings
 from django.contrib import messages
@@ -10,14 +17,21 @@ from django.contrib.auth.views import (
     PasswordChangeView as DjangoPasswordChangeView,
     PasswordResetConfirmView as DjangoPasswordResetConfirmView,
 )
-from django.db.models import Count
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.db.models import Count, Sum
 from django.forms import TextInput
-from django.http import HttpResponseRedirect, Http404
+from django.http import HttpResponseRedirect, Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import DetailView, TemplateView, ListView
-from django.views.generic.edit import DeleteView, CreateView, UpdateView
+from django.views.generic import DetailView, TemplateView, ListView, View
+from django.views.generic.edit import DeleteView, CreateView, UpdateView, FormView
 from mptt.utils import get_cached_trees
 
 from .forms import (
@@ -31,10 +45,25 @@ from .forms import (
     ProjectCreateForm,
     ProjectEditForm,
     ProjectReorderForm,
+    QuantitiesImportForm,
     QuantityEditForm,
     QuantityDeleteForm,
 )
-from .models import Project, Category, Quantity, Intervals, get_dates_interval, get_prev_and_next_dates_interval
+from .models import (
+    Project,
+    Category,
+    Quantity,
+    Intervals,
+    CategoryDailyTotal,
+    get_dates_interval,
+    get_interval_str,
+    get_prev_and_next_dates_interval,
+)
+from .caching import get_last_modified, get_projects_versions, has_categories_tree
+from .importing import QuantitiesImporter, read_rows
+from .pagination import QuantityKeysetPage
+from .search import search_quantities
+from .templatetags import core_utils
 from . import signals
 
 
@@ -122,18 +151,82 @@ class HomeView(DateAndIntervalMixin, TemplateView):
     template_name = "index.html"
 
 
-class ProjectsView(DateAndIntervalMixin, LoginRequiredMixin, TemplateView):
+class ConditionalGetMixin:
+    """Answer with a 304 the GET requests of a browser already having the current page, before loading the categories
+    or summing the quantities.
+
+    The page depends on the data versions of the projects of `get_projects_ids` and on the list of the projects of the
+    user (see `ProjectManager.projects_changed`), from which the ETag and the Last-Modified headers are computed.
+    """
+
+    def get_projects_ids(self) -> list[int]:
+        return [self.project.pk]
+
+    def get(self, request, *args, **kwargs):
+        # the messages waiting to be displayed are only in a new page
+        if messages.get_messages(request):
+            return super().get(request, *args, **kwargs)
+
+        projects_ids = self.get_projects_ids()
+        versions = get_projects_versions(projects_ids)
+        last_modified = get_last_modified([f"user:{request.user.pk}", *(f"project:{pk}" for pk in projects_ids)])
+        # without a date in the querystring, the period displayed changes each day
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        last_modified = int(max(last_modified, today.timestamp()))
+        key = (
+            request.get_full_path(),
+            request.user.pk,
+            # the CSRF token of the forms of the page
+            request.META.get("CSRF_COOKIE"),
+            self.date,
+            self.interval,
+            sorted(versions.items()),
+            last_modified,
+        )
+        etag = quote_etag(hashlib.md5(repr(key).encode()).hexdigest())
+        if (response := get_conditional_response(request, etag=etag, last_modified=last_modified)) is None:
+            response = super().get(request, *args, **kwargs)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Cookie"])
+        return response
+
+
+class ProjectsView(ConditionalGetMixin, DateAndIntervalMixin, LoginRequiredMixin, TemplateView):
     template_name = "projects.html"
 
+    def get_projects_ids(self):
+        return [project.pk for project in self.request.user.cached_projects]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        self.sum_projects(self.get_projects_to_sum())
+        return context
+
+    def get_projects_to_sum(self) -> list[tuple[list[Project], tuple]]:
+        """Get the projects to display with their summed quantities, grouped by arguments of `summed_quantities_for`"""
+        with_dates, without_dates = [], []
         for project in self.request.user.cached_projects:
             if project.nb_categories > 1:
                 if project.has_interval or self.interval not in (None, Intervals.none):
-                    project.summed_quantities = project.get_summed_quantities(self.date, self.interval)
+                    with_dates.append(project)
                 else:
-                    project.summed_quantities = project.get_summed_quantities()
-        return context
+                    without_dates.append(project)
+        return [
+            (projects, args)
+            for projects, args in ((with_dates, (self.date, self.interval)), (without_dates, ()))
+            if projects
+        ]
+
+    def sum_projects(self, projects_to_sum: list[tuple[list[Project], tuple]]):
+        for projects, args in projects_to_sum:
+            self.set_summed_quantities(projects, *args)
+
+    @staticmethod
+    def set_summed_quantities(projects: list[Project], *args):
+        for project, summed_quantities in Project.objects.summed_quantities_for(projects, *args).items():
+            project.summed_quantities = summed_quantities
 
 
 class OwnedProjectMixin(DateAndIntervalMixin, LoginRequiredMixin, UserPassesTestMixin):
@@ -157,6 +250,16 @@ class OwnedProjectMixin(DateAndIntervalMixin, LoginRequiredMixin, UserPassesTest
     def test_func(self):
         return self.request.user == self.project.owner
 
+    @cached_property
+    def summed_quantities_args(self) -> tuple:
+        """The arguments of `get_summed_quantities` for the date and interval of the request"""
+        if self.project.has_interval or self.interval not in (None, Intervals.none):
+            return self.date, self.interval
+        return ()
+
+    def set_summed_quantities(self):
+        self.project.summed_quantities = self.project.get_summed_quantities(*self.summed_quantities_args)
+
 
 class OwnedCategoryMixin(OwnedProjectMixin):
     @cached_property
@@ -178,11 +281,7 @@ class OwnedCategoryMixin(OwnedProjectMixin):
 class ProjectOrCategoryDetailsMixin:
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.project.has_interval or self.interval not in (None, Intervals.none):
-            self.project.summed_quantities = self.project.get_summed_quantities(self.date, self.interval)
-        else:
-            self.project.summed_quantities = self.project.get_summed_quantities()
-
+        self.set_summed_quantities()
         return context
 
 
@@ -190,7 +289,7 @@ class ProjectOrCategoryDetailsBaseView(ProjectOrCategoryDetailsMixin, DetailView
     template_name = "project_or_category_details.html"
 
 
-class ProjectDetailsView(OwnedProjectMixin, ProjectOrCategoryDetailsBaseView):
+class ProjectDetailsView(ConditionalGetMixin, OwnedProjectMixin, ProjectOrCategoryDetailsBaseView):
     model = Project
     pk_url_kwarg = "project_pk"
 
@@ -198,7 +297,7 @@ class ProjectDetailsView(OwnedProjectMixin, ProjectOrCategoryDetailsBaseView):
         return self.project
 
 
-class CategoryDetailsView(OwnedCategoryMixin, ProjectOrCategoryDetailsBaseView):
+class CategoryDetailsView(ConditionalGetMixin, OwnedCategoryMixin, ProjectOrCategoryDetailsBaseView):
     model = Category
     pk_url_kwarg = "category_pk"
 
@@ -206,6 +305,158 @@ class CategoryDetailsView(OwnedCategoryMixin, ProjectOrCategoryDetailsBaseView):
         return self.category
 
 
+class SummaryMixin:
+    """The summed quantities of the project, or of a category and its descendants, as JSON, for the date and the
+    interval of the querystring.
+
+    The ETag is computed from the key of the cache of the summed quantities, that changes with the data version of
+    the project, so that a request with a matching `If-None-Match` gets a 304 without them being computed.
+    """
+
+    # answer the requests not allowed with a 403 instead of redirecting them to the login page
+    raise_exception = True
+
+    def get_categories(self) -> list[Category]:
+        raise NotImplementedError
+
+    def get_etag_key(self) -> str:
+        return self.project.get_summed_quantities_cache_key(*self.summed_quantities_args)
+
+    def get(self, request, *args, **kwargs):
+        etag = quote_etag(hashlib.md5(self.get_etag_key().encode()).hexdigest())
+        if (response := get_conditional_response(request, etag=etag)) is None:
+            self.set_summed_quantities()
+            response = JsonResponse(self.get_data(), encoder=DjangoJSONEncoder)
+        response["ETag"] = etag
+        # to be checked each time, but only by the browser of the user
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_period_data(self) -> dict:
+        date, interval = self.summed_quantities_args or (None, None)
+        interval = self.project.get_summed_quantities_interval(interval)
+        dates = self.project.get_summed_quantities_dates(date, interval)
+        return {
+            "date": date,
+            "interval": interval.value,
+            "start_date": dates[0] if dates else None,
+            "end_date": dates[1] if dates else None,
+            "name": get_interval_str(date, interval) if dates else None,
+        }
+
+    def get_data(self) -> dict:
+        categories = self.get_categories()
+        return {
+            "project": {
+                "id": self.project.pk,
+                "name": self.project.name,
+                "quantity_name": self.project.quantity_name,
+                "interval": self.project.interval,
+                "interval_quantity": self.project.interval_quantity,
+                "goal_mode": self.project.goal_mode,
+                "root_category_id": self.project.root_category.pk,
+            },
+            "period": self.get_period_data(),
+            "categories": {
+                category.pk: {"name": category.name, "parent_id": category.parent_id, "level": category.level}
+                for category in categories
+            },
+            "summed_quantities": {category.pk: self.project.summed_quantities[category] for category in categories},
+        }
+
+
+class ProjectSummaryView(SummaryMixin, OwnedProjectMixin, View):
+    def get_categories(self):
+        return self.project.cached_categories
+
+
+class CategorySummaryView(SummaryMixin, OwnedCategoryMixin, View):
+    def get_categories(self):
+        return self.project.get_descendant_categtories(self.category, include_it=True)
+
+    def get_etag_key(self):
+        return f"{super().get_etag_key()}:{self.category.pk}"
+
+    def get_data(self):
+        return super().get_data() | {"category_id": self.category.pk}
+
+
+async def run_concurrently(*functions: Callable[[], Any]) -> list:
+    """Run the given sync functions at the same time, each in its own thread, and return their results.
+
+    The async ORM of Django runs the queries one after the other in a single thread, so to really run them at the same
+    time each function uses the database connection of its own thread, closed at the end like after a request.
+    """
+
+    def run(function):
+        try:
+            return function()
+        finally:
+            close_old_connections()
+
+    return await asyncio.gather(*(sync_to_async(run, thread_sensitive=False)(function) for function in functions))
+
+
+class AsyncViewMixin:
+    """Make an async variant of a view, to serve with ASGI.
+
+    The queries that don't depend on each other are done at the same time before running the sync view in a thread:
+    the projects of the user (used everywhere, including by `default_context`) and the ones of `get_prefetch_functions`.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        # the user is loaded from the session outside of the event loop
+        if await sync_to_async(lambda: request.user.is_authenticated)():
+            results = await run_concurrently(lambda: request.user.cached_projects, *self.get_prefetch_functions())
+            self.prefetched(*results[1:])
+        response = await sync_to_async(super().dispatch)(request, *args, **kwargs)
+        return await response if asyncio.iscoroutine(response) else response
+
+    async def get(self, request, *args, **kwargs):
+        return await sync_to_async(super().get)(request, *args, **kwargs)
+
+    def get_prefetch_functions(self) -> list[Callable[[], Any]]:
+        return []
+
+    def prefetched(self, *results):
+        """Use the results of the functions of `get_prefetch_functions`"""
+
+
+class AsyncProjectsView(AsyncViewMixin, ProjectsView):
+    def sum_projects(self, projects_to_sum):
+        # the projects with and without dates are summed at the same time, from the thread running the sync view
+        async_to_sync(run_concurrently)(
+            *(partial(self.set_summed_quantities, projects, *args) for projects, args in projects_to_sum)
+        )
+
+
+class AsyncOwnedProjectMixin(AsyncViewMixin):
+    """Async variant of `OwnedProjectMixin`, fetching the categories of the project at the same time as the projects"""
+
+    def get_prefetch_functions(self):
+        return [self.fetch_categories]
+
+    def fetch_categories(self) -> Optional[list[Category]]:
+        # most of the time the process already has them for the current version of the tree, that is not known yet
+        if has_categories_tree(project_pk := self.kwargs.get("project_pk")):
+            return None
+        categories = Category.objects.filter(project_id=project_pk)
+        categories._fetch_all()
+        return categories._result_cache
+
+    def prefetched(self, categories):
+        if categories is not None and (project := self.request.user.get_project(self.kwargs.get("project_pk"))):
+            Project.objects.set_cached_categories({project.pk: project}, categories)
+
+
+class AsyncProjectDetailsView(AsyncOwnedProjectMixin, ProjectDetailsView):
+    pass
+
+
+class AsyncCategoryDetailsView(AsyncOwnedProjectMixin, CategoryDetailsView):
+    pass
+
+
 class ProjectFormViewMixin:
     model = Project
 
@@ -354,7 +605,161 @@ class CategoryDeleteView(OwnedCategoryMixin, CategoryFormViewMixin, DeleteView):
         return kwargs
 
 
-class QuantityCreateBaseView(CreateView):
+class CategoriesReorganizeView(OwnedProjectMixin, View):
+    """The tree of categories of the project as JSON, to give it a new shape in a single request.
+
+    A GET gives the current tree: `{"tree": [{"id": 1, "name": "...", "children": [...]}, ...]}`.
+
+    A POST takes either a whole new tree in the same format, the names being optional, or moves applied one after the
+    other to the current tree: `{"moves": [{"id": 1, "parent": 2, "position": 0}, ...]}`, with a null parent for the
+    top level and the position among the new siblings being optional (at the end by default). It answers with the new
+    tree, or with the errors and a 400.
+    """
+
+    # answer the requests not allowed with a 403 instead of redirecting them to the login page
+    raise_exception = True
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({"tree": self.get_tree()})
+
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+            if "tree" in data:
+                children = self.get_children_from_tree(data["tree"])
+            else:
+                children = self.get_children_from_moves(data["moves"])
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({"errors": ["Invalid data."]}, status=400)
+        except ValidationError as error:
+            return JsonResponse({"errors": error.messages}, status=400)
+
+        try:
+            changed = self.project.reorganize_categories(children)
+        except ValidationError as error:
+            return JsonResponse({"errors": error.messages}, status=400)
+        return JsonResponse({"tree": self.get_tree(), "changed": changed})
+
+    def get_tree(self) -> list[dict]:
+        nodes = {}
+        for category in self.project.cached_categories:
+            nodes[category.pk] = {"id": category.pk, "name": category.name, "children": []}
+            if category.parent_id:
+                nodes[category.parent_id]["children"].append(nodes[category.pk])
+        return nodes[self.project.root_category.pk]["children"]
+
+    def get_children_from_tree(self, tree: list[dict]) -> dict[int, list[int]]:
+        children, seen = {}, set()
+        stack = [(self.project.root_category.pk, tree)]
+        while stack:
+            parent_pk, nodes = stack.pop()
+            if not isinstance(nodes, list):
+                raise TypeError()
+            children[parent_pk] = [int(node["id"]) for node in nodes]
+            for pk in children[parent_pk]:
+                if pk in seen:
+                    raise ValidationError(f"Category {pk} appears more than once.")
+                seen.add(pk)
+            stack.extend((int(node["id"]), node.get("children", [])) for node in nodes)
+        return children
+
+    def get_children_from_moves(self, moves: list[dict]) -> dict[int, list[int]]:
+        root_pk = self.project.root_category.pk
+        children = {category.pk: [] for category in self.project.cached_categories}
+        parents = {}
+        for category in self.project.cached_categories:
+            if category.parent_id:
+                children[category.parent_id].append(category.pk)
+                parents[category.pk] = category.parent_id
+
+        for move in moves:
+            pk = int(move["id"])
+            parent_pk = root_pk if move.get("parent") is None else int(move["parent"])
+            # the root category has no parent, so it cannot be moved
+            if pk not in parents:
+                raise ValidationError(f"Unknown category: {pk}")
+            if parent_pk not in children:
+                raise ValidationError(f"Unknown category: {parent_pk}")
+            children[parents[pk]].remove(pk)
+            if (position := move.get("position")) is None:
+                children[parent_pk].append(pk)
+            else:
+                children[parent_pk].insert(int(position), pk)
+            parents[pk] = parent_pk
+        return children
+
+
+class QuantityFragmentsMixin:
+    """Respond to the requests having a `X-Fragments` header, sent by `main.js`, with only the parts of the pages
+    changed by the quantity instead of redirecting to the page.
+
+    These parts are the summaries of its categories and their ancestors, and its row in the list of quantities. If
+    the form is invalid, it's rendered alone with its errors.
+    """
+
+    form_template_name = "quantity_form_include.html"
+
+    @cached_property
+    def wants_fragments(self) -> bool:
+        return "X-Fragments" in self.request.headers
+
+    def get_object(self, queryset=None):
+        quantity = super().get_object(queryset)
+        # before it's changed by the form
+        self.previous_category_id = quantity.category_id
+        return quantity
+
+    def form_valid(self, form):
+        quantity_pk = self.object.pk if self.object else None
+        response = super().form_valid(form)
+        if not self.wants_fragments:
+            return response
+        context = self.get_context_data(form=form) | self.get_fragments_context(quantity_pk)
+        return TemplateResponse(self.request, "quantity_fragments.html", context)
+
+    def form_invalid(self, form):
+        if not self.wants_fragments:
+            return super().form_invalid(form)
+        context = self.get_context_data(form=form, next_with_children=self.request.GET.get("with-children") != "0")
+        return TemplateResponse(self.request, self.form_template_name, context, status=400)
+
+    def get_fragments_context(self, quantity_pk: Optional[int]) -> dict:
+        self.set_summed_quantities()
+
+        changed_categories = {}
+        for category_id in (getattr(self, "previous_category_id", None), self.object.category_id):
+            if category_id and (category := self.project.get_category(category_id)):
+                for ancestor in self.project.get_ancestors_categories(category, include_it=True):
+                    changed_categories[ancestor.pk] = (ancestor, ancestor if ancestor.parent_id else self.project)
+
+        # the page of the list of quantities, if it's from there
+        list_category = self.next_category or self.project.root_category
+        with_children = self.request.GET.get("with-children", "1") != "0"
+        context = {
+            "changed_categories": changed_categories.values(),
+            "current_category": self.next_category,
+            "with_children": with_children,
+            "quantity": None,
+        }
+
+        # a new quantity is not added to the list, as its place in it is not known
+        if not quantity_pk:
+            return context
+        quantity = self.object
+        if quantity.pk is None:
+            return context | {"removed_quantity_pk": quantity_pk}
+
+        quantity.category = self.project.get_category(quantity.category_id)
+        ancestors = self.project.get_ancestors_categories(quantity.category)
+        start_date, end_date = self.start_and_end_dates
+        in_list = quantity.category == list_category or (with_children and list_category in ancestors)
+        if not in_list or not start_date <= quantity.date <= end_date:
+            return context | {"removed_quantity_pk": quantity_pk}
+        quantity.category.in_between_ancestors = tuple(ancestors)[list_category.level + 1 :]
+        return context | {"quantity": quantity}
+
+
+class QuantityCreateBaseView(QuantityFragmentsMixin, CreateView):
     template_name = "quantity_form.html"
     model = Quantity
 
@@ -430,17 +835,36 @@ class QuantityInCategoryCreateView(OwnedCategoryMixin, QuantityCreateBaseView):
         return super().get_form_kwargs() | {"category": self.category}
 
 
-class QuantitiesBaseView(ProjectOrCategoryDetailsMixin, ListView):
-    template_name = "quantities.html"
-    context_object_name = "quantities"
-    paginate_by = 25
-
+class QuantitiesFilterMixin:
     @cached_property
     def categories(self):
         if self.request.GET.get("with-children", "1") == "0":
             return [self.category]
         return self.category.get_descendants(include_self=True)
 
+    @cached_property
+    def search(self) -> str:
+        return self.request.GET.get("search", "").strip()
+
+    @property
+    def queryset(self):
+        if not self.category.parent_id and self.request.GET.get("with-children", "1") != "0":
+            # all the quantities of the project
+            queryset = Quantity.objects.filter(project=self.project)
+        else:
+            queryset = Quantity.objects.filter(category__in=self.categories)
+        start_date, end_date = self.start_and_end_dates
+        queryset = queryset.filter(date__gte=start_date, date__lte=end_date)
+        if self.search:
+            queryset = search_quantities(queryset, self.search)
+        return queryset
+
+
+class QuantitiesBaseView(QuantitiesFilterMixin, ProjectOrCategoryDetailsMixin, ListView):
+    template_name = "quantities.html"
+    context_object_name = "quantities"
+    paginate_by = 25
+
     @cached_property
     def prepared_categories(self):
         categories = {category.id: category for category in self.project.cached_categories}
@@ -450,16 +874,44 @@ class QuantitiesBaseView(ProjectOrCategoryDetailsMixin, ListView):
             ]
         return categories
 
-    @property
-    def queryset(self):
-        queryset = Quantity.objects.filter(category__in=self.categories)
+    @cached_property
+    def keyset_pagination(self):
+        return settings.QUANTITIES_PAGINATION == "keyset"
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.keyset_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        page = QuantityKeysetPage(
+            queryset, page_size, older=self.request.GET.get("older"), newer=self.request.GET.get("newer")
+        )
+        return None, page, page.object_list, page.has_other_pages()
+
+    def get_keyset_pagination_context(self, page):
         start_date, end_date = self.start_and_end_dates
-        queryset = queryset.filter(date__gte=start_date, date__lte=end_date)
-        return queryset
+        context = {
+            # no need to count the quantities, we have the daily totals, except for the ones found by a search
+            "quantities_count": self.object_list.count()
+            if self.search
+            else CategoryDailyTotal.objects.filter(
+                category__in=self.categories, date__gte=start_date, date__lte=end_date
+            ).aggregate(count=Sum("count", default=0))["count"],
+        }
+        for direction in ("older", "newer"):
+            if cursor := getattr(page, f"{direction}_cursor"):
+                query = self.request.GET.copy()
+                query.pop("older", None)
+                query.pop("newer", None)
+                query[direction] = cursor
+                context[f"{direction}_query"] = query.urlencode()
+        return context
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs, with_children=self.request.GET.get("with-children", "1") != "0")
-        if paginator := context.get("paginator"):
+        context = super().get_context_data(
+            **kwargs, with_children=self.request.GET.get("with-children", "1") != "0", search=self.search
+        )
+        if self.keyset_pagination:
+            context.update(keyset_pagination=True, **self.get_keyset_pagination_context(context["page_obj"]))
+        elif paginator := context.get("paginator"):
             context["elided_pages"] = paginator.get_elided_page_range(
                 number=context["page_obj"].number,
                 on_each_side=1,
@@ -470,16 +922,107 @@ class QuantitiesBaseView(ProjectOrCategoryDetailsMixin, ListView):
         return context
 
 
-class ProjectQuantitiesView(OwnedProjectMixin, QuantitiesBaseView):
+class ProjectQuantitiesView(ConditionalGetMixin, OwnedProjectMixin, QuantitiesBaseView):
     @cached_property
     def category(self):
         return self.project.root_category
 
 
-class CategoryQuantitiesView(OwnedCategoryMixin, QuantitiesBaseView):
+class CategoryQuantitiesView(ConditionalGetMixin, OwnedCategoryMixin, QuantitiesBaseView):
     pass
 
 
+class EchoBuffer:
+    """Simple file-like object for `csv.writer` to give back each line instead of writing it somewhere"""
+
+    def write(self, value):
+        return value
+
+
+class QuantitiesExportBaseView(QuantitiesFilterMixin, View):
+    formats = {
+        "csv": "text/csv",
+        "ndjson": "application/x-ndjson",
+    }
+    fields = ("category", "date", "time", "value", "notes")
+    chunk_size = 2000
+
+    @cached_property
+    def format(self):
+        if (format := self.request.GET.get("format", "csv")) not in self.formats:
+            raise Http404()
+        return format
+
+    def get_rows(self):
+        # no model instances, and the rows are fetched by chunks, so the memory used does not depend on their number
+        paths = self.project.get_categories_paths()
+        for category_id, *values in self.queryset.values_list("category_id", *self.fields[1:]).iterator(
+            chunk_size=self.chunk_size
+        ):
+            yield paths[category_id], *values
+
+    def stream_csv(self):
+        writer = csv.writer(EchoBuffer())
+        yield writer.writerow(self.fields)
+        for row in self.get_rows():
+            yield writer.writerow(row)
+
+    def stream_ndjson(self):
+        for row in self.get_rows():
+            yield json.dumps(dict(zip(self.fields, row)), cls=DjangoJSONEncoder) + "\n"
+
+    def get_filename(self):
+        parts = [self.project.name] + [
+            category.name
+            for category in self.project.get_ancestors_categories(self.category, include_it=True)
+            if category.parent_id
+        ]
+        if self.interval and self.interval != Intervals.none:
+            parts.append(str(self.date))
+            parts.append(self.interval.value)
+        return f"{slugify('-'.join(parts))}.{self.format}"
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            getattr(self, f"stream_{self.format}")(),
+            content_type=f"{self.formats[self.format]}; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{self.get_filename()}"'
+        return response
+
+
+class ProjectQuantitiesExportView(OwnedProjectMixin, QuantitiesExportBaseView):
+    @cached_property
+    def category(self):
+        return self.project.root_category
+
+
+class CategoryQuantitiesExportView(OwnedCategoryMixin, QuantitiesExportBaseView):
+    pass
+
+
+class QuantitiesImportView(OwnedProjectMixin, FormView):
+    form_class = QuantitiesImportForm
+    template_name = "quantities_import.html"
+
+    def form_valid(self, form):
+        importer = QuantitiesImporter(self.project)
+        lines = io.TextIOWrapper(form.cleaned_data["file"], encoding="utf-8-sig", newline="")
+        try:
+            success = importer.run(read_rows(lines, form.cleaned_data["format"]))
+        except (UnicodeDecodeError, csv.Error):
+            form.add_error("file", "The file cannot be read, it must be a CSV or NDJSON file encoded in UTF-8.")
+            return self.form_invalid(form)
+
+        if not success:
+            for line_number, error in importer.errors:
+                form.add_error("file", f"Line {line_number}: {error}")
+            return self.form_invalid(form)
+
+        messages.success(self.request, f"{importer.nb_created} quantities imported.")
+        return HttpResponseRedirect(f"{self.project.get_quantities_url()}?interval={Intervals.none.value}")
+
+
 class QuantityFormViewMixin(OwnedCategoryMixin):
     model = Quantity
     pk_url_kwarg = "quantity_pk"
@@ -516,14 +1059,15 @@ class QuantityFormViewMixin(OwnedCategoryMixin):
         return url
 
 
-class QuantityEditView(QuantityFormViewMixin, UpdateView):
+class QuantityEditView(QuantityFormViewMixin, QuantityFragmentsMixin, UpdateView):
     form_class = QuantityEditForm
     template_name = "quantity_form.html"
 
 
-class QuantityDeleteView(QuantityFormViewMixin, DeleteView):
+class QuantityDeleteView(QuantityFormViewMixin, QuantityFragmentsMixin, DeleteView):
     form_class = QuantityDeleteForm
     template_name = "quantity_delete_form.html"
+    form_template_name = "quantity_delete_form_include.html"
 
     def get_form_kwargs(self):
         # not done by the default delete view because it uses a simple form, but here we use a model form
@@ -531,3 +1075,101 @@ class QuantityDeleteView(QuantityFormViewMixin, DeleteView):
         if hasattr(self, "object"):
             kwargs.update({"instance": self.object})
         return kwargs
+
+
+class FormFragmentMixin:
+    """Render only the form of one of the inclusion tags of `core_utils`, without the page around it.
+
+    The forms of the categories and quantities are not rendered in the pages but loaded from these views when their
+    dropdown is opened (see `main.js`), so that the pages do not contain a form for each category or quantity.
+    """
+
+    # the inclusion tag giving the context of the template
+    form_tag: Callable[..., dict]
+
+    @cached_property
+    def next_category(self) -> Optional[Category]:
+        if (
+            (next := self.request.GET.get("next", "")).startswith("category:")
+            and (category_id := next.split(":")[1])
+            and category_id.isdigit()
+        ):
+            return self.project.get_category(int(category_id))
+        return None
+
+    def get_form_tag_kwargs(self) -> dict:
+        raise NotImplementedError
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        return context | self.form_tag(context, **self.get_form_tag_kwargs())
+
+
+class QuantityInProjectFormFragmentView(FormFragmentMixin, OwnedProjectMixin, TemplateView):
+    template_name = "quantity_form_include.html"
+    form_tag = staticmethod(core_utils.quantity_in_project_form)
+
+    def get_form_tag_kwargs(self):
+        return {
+            "project": self.project,
+            "back_to_project": self.request.GET.get("next") == f"project:{self.project.pk}",
+        }
+
+
+class QuantityInCategoryFormFragmentView(FormFragmentMixin, OwnedCategoryMixin, TemplateView):
+    template_name = "quantity_form_include.html"
+    form_tag = staticmethod(core_utils.quantity_in_category_form)
+
+    def get_form_tag_kwargs(self):
+        initial_value = self.request.GET.get("initial-value", "")
+        return {
+            "category": self.category,
+            "next_category": self.next_category,
+            "initial_value": int(initial_value) if initial_value.isdigit() else None,
+        }
+
+
+class CategoryEditFormFragmentView(FormFragmentMixin, OwnedCategoryMixin, TemplateView):
+    template_name = "category_form_include.html"
+    form_tag = staticmethod(core_utils.category_form)
+
+    def get_form_tag_kwargs(self):
+        return {"project": self.project, "category": self.category, "next_category": self.next_category}
+
+
+class CategoryDeleteFormFragmentView(FormFragmentMixin, OwnedCategoryMixin, TemplateView):
+    template_name = "category_delete_form_include.html"
+    form_tag = staticmethod(core_utils.category_delete_form)
+
+    def get_form_tag_kwargs(self):
+        return {"category": self.category, "next_category": self.next_category}
+
+
+class QuantityFormFragmentMixin(FormFragmentMixin, OwnedCategoryMixin):
+    @cached_property
+    def quantity(self):
+        quantity = get_object_or_404(self.category.quantities, pk=self.kwargs.get("quantity_pk"))
+        # the cached one, to not fetch it again
+        quantity.category = self.category
+        return quantity
+
+    @property
+    def next_with_children(self) -> bool:
+        return self.request.GET.get("with-children", "1") != "0"
+
+    def get_form_tag_kwargs(self):
+        return {
+            "quantity": self.quantity,
+            "next_category": self.next_category,
+            "next_with_children": self.next_with_children,
+        }
+
+
+class QuantityEditFormFragmentView(QuantityFormFragmentMixin, TemplateView):
+    template_name = "quantity_form_include.html"
+    form_tag = staticmethod(core_utils.quantity_edit_form)
+
+
+class QuantityDeleteFormFragmentView(QuantityFormFragmentMixin, TemplateView):
+    template_name = "quantity_delete_form_include.html"
+    form_tag = staticmethod(core_utils.quantity_delete_form)
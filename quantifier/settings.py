@@ -83,6 +83,18 @@ MIDDLEWARE += [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Measure the time spent in SQL, in the computation of the summed quantities, in the template tags and in the
+# rendering of each request, to send it in a `Server-Timing` header and log it
+SERVER_TIMING = env.bool("SERVER_TIMING", default=False)
+if SERVER_TIMING:
+    MIDDLEWARE.insert(0, "core.timing.ServerTimingMiddleware")
+    LOGGING = {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "handlers": {"console": {"class": "logging.StreamHandler"}},
+        "loggers": {"core.timing": {"handlers": ["console"], "level": "INFO"}},
+    }
+
 ROOT_URLCONF = "quantifier.urls"
 
 AUTH_USER_MODEL = "core.User"
@@ -131,6 +143,10 @@ DATABASES = {
 }
 ATOMIC_REQUESTS = True
 
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -181,5 +197,32 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 MPTT_DEFAULT_LEVEL_INDICATOR = "└─"
 
+# How to roll-up the summed quantities of the categories in their parents:
+# - "python": by walking the tree of categories
+# - "sql": by summing the subtrees in the database, using the MPTT nested sets
+# - "numpy": with vectorized operations on arrays of the categories (needs numpy to be installed)
+SUMMED_QUANTITIES_ROLLUP = env("SUMMED_QUANTITIES_ROLLUP", default="python")
+
+# How long to keep the summed quantities in cache. They are cached for a version of the data of each project, so
+# they never get stale, this is only to free the space used by the old versions.
+SUMMED_QUANTITIES_CACHE_TIMEOUT = env.int("SUMMED_QUANTITIES_CACHE_TIMEOUT", default=24 * 60 * 60)
+
+# How long to wait, in seconds, for the summed quantities being computed by another request (in this process or, if
+# the cache is shared, in another one) before computing them again. Set to 0 to never wait for them.
+SUMMED_QUANTITIES_SINGLE_FLIGHT_WAIT = env.float("SUMMED_QUANTITIES_SINGLE_FLIGHT_WAIT", default=10)
+
+# How many projects to keep the categories of in each process, to build them without any query while they don't
+# change. Set to 0 to disable it.
+CATEGORIES_TREE_CACHE_SIZE = env.int("CATEGORIES_TREE_CACHE_SIZE", default=1000)
+
+# Use the async variants of the projects and details views, that do their independent queries at the same time. Only
+# useful when served with ASGI (see `quantifier/asgi.py`).
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", default=False)
+
+# How to paginate the lists of quantities:
+# - "offset": with numbered pages, needing to count all the quantities of the period
+# - "keyset": with links to older/newer quantities, seeking the page from the last/first quantity of the current one
+QUANTITIES_PAGINATION = env("QUANTITIES_PAGINATION", default="offset")
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
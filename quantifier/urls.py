@@ -22,6 +22,19 @@ from django_registration.backends.one_step.views import RegistrationView
 from core import views
 from core.forms import CoreRegistrationForm
 
+if settings.ASYNC_VIEWS:
+    ProjectsView, ProjectDetailsView, CategoryDetailsView = (
+        views.AsyncProjectsView,
+        views.AsyncProjectDetailsView,
+        views.AsyncCategoryDetailsView,
+    )
+else:
+    ProjectsView, ProjectDetailsView, CategoryDetailsView = (
+        views.ProjectsView,
+        views.ProjectDetailsView,
+        views.CategoryDetailsView,
+    )
+
 urlpatterns = [
     path(
         "accounts/register/",
@@ -45,13 +58,18 @@ urlpatterns = [
     path("accounts/", include("django.contrib.auth.urls")),
     path("admin/", admin.site.urls),
     path("", views.HomeView.as_view(), name="index"),
-    path("projects/", views.ProjectsView.as_view(), name="projects"),
+    path("projects/", ProjectsView.as_view(), name="projects"),
     path("project/create/", views.ProjectCreateView.as_view(), name="project_create"),
     path(
         "project/<int:project_pk>/",
-        views.ProjectDetailsView.as_view(),
+        ProjectDetailsView.as_view(),
         name="project_details",
     ),
+    path(
+        "project/<int:project_pk>/summary/",
+        views.ProjectSummaryView.as_view(),
+        name="project_summary",
+    ),
     path(
         "project/<int:project_pk>/edit/",
         views.ProjectEditView.as_view(),
@@ -67,16 +85,36 @@ urlpatterns = [
         views.ProjectReorderView.as_view(),
         name="project_reorder",
     ),
+    path(
+        "project/<int:project_pk>/categories/reorganize/",
+        views.CategoriesReorganizeView.as_view(),
+        name="categories_reorganize",
+    ),
     path(
         "project/<int:project_pk>/quantities/",
         views.ProjectQuantitiesView.as_view(),
         name="quantities_list",
     ),
+    path(
+        "project/<int:project_pk>/quantities/export/",
+        views.ProjectQuantitiesExportView.as_view(),
+        name="quantities_export",
+    ),
+    path(
+        "project/<int:project_pk>/quantities/import/",
+        views.QuantitiesImportView.as_view(),
+        name="quantities_import",
+    ),
     path(
         "project/<int:project_pk>/quantity/create/",
         views.QuantityInProjectCreateView.as_view(),
         name="quantity_create",
     ),
+    path(
+        "project/<int:project_pk>/quantity/create/form/",
+        views.QuantityInProjectFormFragmentView.as_view(),
+        name="quantity_create_form",
+    ),
     path(
         "project/<int:project_pk>/category/create/",
         views.CategoryCreateView.as_view(),
@@ -84,19 +122,34 @@ urlpatterns = [
     ),
     path(
         "project/<int:project_pk>/category/<int:category_pk>/",
-        views.CategoryDetailsView.as_view(),
+        CategoryDetailsView.as_view(),
         name="category_details",
     ),
+    path(
+        "project/<int:project_pk>/category/<int:category_pk>/summary/",
+        views.CategorySummaryView.as_view(),
+        name="category_summary",
+    ),
     path(
         "project/<int:project_pk>/category/<int:category_pk>/edit/",
         views.CategoryEditView.as_view(),
         name="category_edit",
     ),
+    path(
+        "project/<int:project_pk>/category/<int:category_pk>/edit/form/",
+        views.CategoryEditFormFragmentView.as_view(),
+        name="category_edit_form",
+    ),
     path(
         "project/<int:project_pk>/category/<int:category_pk>/delete/",
         views.CategoryDeleteView.as_view(),
         name="category_delete",
     ),
+    path(
+        "project/<int:project_pk>/category/<int:category_pk>/delete/form/",
+        views.CategoryDeleteFormFragmentView.as_view(),
+        name="category_delete_form",
+    ),
     path(
         "project/<int:project_pk>/category/<int:category_pk>/reorder/",
         views.CategoryReorderView.as_view(),
@@ -112,21 +165,41 @@ urlpatterns = [
         views.QuantityInCategoryCreateView.as_view(),
         name="quantity_in_category_create",
     ),
+    path(
+        "project/<int:project_pk>/category/<int:category_pk>/quantity/create/form/",
+        views.QuantityInCategoryFormFragmentView.as_view(),
+        name="quantity_in_category_create_form",
+    ),
     path(
         "project/<int:project_pk>/category/<int:category_pk>/quantities/",
         views.CategoryQuantitiesView.as_view(),
         name="quantities_list",
     ),
+    path(
+        "project/<int:project_pk>/category/<int:category_pk>/quantities/export/",
+        views.CategoryQuantitiesExportView.as_view(),
+        name="quantities_export",
+    ),
     path(
         "project/<int:project_pk>/category/<int:category_pk>/quantity/<int:quantity_pk>/edit/",
         views.QuantityEditView.as_view(),
         name="quantity_edit",
     ),
+    path(
+        "project/<int:project_pk>/category/<int:category_pk>/quantity/<int:quantity_pk>/edit/form/",
+        views.QuantityEditFormFragmentView.as_view(),
+        name="quantity_edit_form",
+    ),
     path(
         "project/<int:project_pk>/category/<int:category_pk>/quantity/<int:quantity_pk>/delete/",
         views.QuantityDeleteView.as_view(),
         name="quantity_delete",
     ),
+    path(
+        "project/<int:project_pk>/category/<int:category_pk>/quantity/<int:quantity_pk>/delete/form/",
+        views.QuantityDeleteFormFragmentView.as_view(),
+        name="quantity_delete_form",
+    ),
 ]
 
 if settings.DEBUG: